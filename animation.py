@@ -0,0 +1,75 @@
+"""Timed playback of engine events.
+
+The engine reports everything it does at once and returns; ``GameEvent.pause``
+only says how long a presenter should hold a message before the next one. An
+``AnimationQueue`` turns those pauses into release times on a clock, so the UI
+can play the events back on a timer instead of blocking while it waits.
+
+Each queued event also records how many dealer cards existed when it was
+raised. Showing only the dealer cards of the events released so far reveals
+the dealer's draws one by one, in step with their messages.
+"""
+import time
+from collections import deque
+from typing import Callable, Deque, List, NamedTuple, Optional
+
+from events import GameEvent
+
+
+class ScheduledEvent(NamedTuple):
+    due: float # Clock time at which the event is shown
+    event: GameEvent
+    dealer_cards: int # Dealer cards dealt when the event was raised
+
+
+class AnimationQueue:
+    """FIFO of events released one after another, each held for its pause."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._scheduled: Deque[ScheduledEvent] = deque()
+        self._free_at = 0.0 # When the last queued event's pause runs out
+        self.dealer_cards: Optional[int] = None # Dealer cards revealed by the released events
+
+    def push(self, event: GameEvent, dealer_cards: int):
+        """Schedules `event` once every earlier event has been shown for its pause."""
+        due = max(self.clock(), self._free_at)
+        self._scheduled.append(ScheduledEvent(due, event, dealer_cards))
+        self._free_at = due + event.pause
+
+    def due(self) -> List[GameEvent]:
+        """Removes and returns the events whose time has come, oldest first."""
+        now = self.clock()
+        released = []
+        while self._scheduled and self._scheduled[0].due <= now:
+            scheduled = self._scheduled.popleft()
+            self.dealer_cards = scheduled.dealer_cards
+            released.append(scheduled.event)
+        return released
+
+    @property
+    def waiting(self) -> bool:
+        """True while events are queued but not yet released."""
+        return bool(self._scheduled)
+
+    @property
+    def busy(self) -> bool:
+        """True while events are waiting or the last one is still being held."""
+        return bool(self._scheduled) or self.clock() < self._free_at
+
+    def visible_dealer_cards(self, dealt: int) -> int:
+        """How many of the `dealt` dealer cards the player should see right now."""
+        if not self.busy:
+            return dealt
+        now = self.clock()
+        shown = self.dealer_cards
+        for scheduled in self._scheduled: # Due but not yet drained counts as shown
+            if scheduled.due > now:
+                break
+            shown = scheduled.dealer_cards
+        return dealt if shown is None else min(dealt, shown)
+
+    def clear(self):
+        self._scheduled.clear()
+        self._free_at = 0.0
+        self.dealer_cards = None
@@ -0,0 +1,99 @@
+"""Benchmark: hand-value lookup table vs. the original Ace enumeration.
+
+Scores the same random hands with the pre-table ``calculate_hand_value`` /
+``get_hand_display_value`` pair (copied below) and with ``hand_values``.
+
+Usage:
+    python bench_hand_values.py [--hands 100000]
+"""
+import argparse
+import random
+import time
+from typing import List, Tuple
+
+from cards import SUITS, VALUES, Card
+from hand_values import hand_state, hand_value, lookup
+
+
+def legacy_calculate_hand_value(hand: List[Card]) -> Tuple[List[int], bool]:
+    value = 0
+    aces = 0
+    for card in hand:
+        if card.value == 'A':
+            aces += 1
+        else:
+            value += card.get_value()
+    possible_values = []
+    if aces == 0:
+        possible_values = [value]
+    else:
+        for i in range(aces + 1):
+            possible_values.append(value + (i * 11) + ((aces - i) * 1))
+    valid_values = sorted([v for v in possible_values if v <= 21])
+    if not valid_values:
+        return [min(possible_values)], False
+    return valid_values, True
+
+
+def legacy_get_hand_display_value(hand: List[Card]) -> str:
+    values, is_valid = legacy_calculate_hand_value(hand)
+    if not is_valid:
+        return f"Bust ({values[0]})"
+    if len(hand) == 2 and values[-1] == 21:
+        has_ace = any(c.value == 'A' for c in hand)
+        has_ten = any(c.get_value() == 10 for c in hand)
+        if has_ace and has_ten:
+            return "Blackjack!"
+    if len(values) > 1 and values[-1] <= 21 and any(c.value == 'A' for c in hand):
+        non_soft_total = sum(c.get_value() if c.value != 'A' else 1 for c in hand)
+        if values[-1] != non_soft_total:
+            return f"Soft {values[-1]}"
+    return str(values[-1] if values else "Error")
+
+
+def random_hands(count: int, rng: random.Random) -> List[List[Card]]:
+    """Hands built the way play builds them: draw until 17+ or bust."""
+    hands = []
+    for _ in range(count):
+        hand = [Card(rng.choice(SUITS), rng.choice(VALUES)) for _ in range(2)]
+        while not hand_value(hand).bust and hand_value(hand).total < 17 and rng.random() < 0.7:
+            hand.append(Card(rng.choice(SUITS), rng.choice(VALUES)))
+        hands.append(hand)
+    return hands
+
+
+def timed(label: str, fn, hands) -> float:
+    start = time.perf_counter()
+    for hand in hands:
+        fn(hand)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<42} {elapsed * 1e9 / len(hands):8.0f} ns/hand")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hands", type=int, default=100000)
+    args = parser.parse_args()
+
+    hands = random_hands(args.hands, random.Random(0))
+    for hand in hands: # The two implementations must agree before timing means anything
+        assert legacy_get_hand_display_value(hand) == hand_value(hand).display, hand
+
+    def legacy(hand):
+        legacy_calculate_hand_value(hand)
+        legacy_get_hand_display_value(hand)
+
+    states = [(*hand_state(hand), len(hand)) for hand in hands]
+    old = timed("legacy calculate + display", legacy, hands)
+    new = timed("hand_value (state scan + table)", hand_value, hands)
+    start = time.perf_counter()
+    for hard, aces, num_cards in states:
+        lookup(hard, aces, num_cards)
+    table = time.perf_counter() - start
+    print(f"{'lookup (known state, O(1))':<42} {table * 1e9 / len(hands):8.0f} ns/hand")
+    print(f"Speedup: {old / new:.1f}x from cards, {old / table:.1f}x from a tracked state")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Playing cards and their compact integer encoding.
+
+A card id is ``suit_index * 13 + rank_index`` (0-51), which is what shoes
+store. The 52 ``Card`` objects are interned at import; dealing or building a
+card only ever hands out a reference to one of them.
+"""
+SUITS = ['Hearts', 'Diamonds', 'Spades', 'Clubs']
+VALUES = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+CARDS_PER_DECK = len(SUITS) * len(VALUES)
+SYMBOLS = {
+    'Hearts': '♥',
+    'Diamonds': '♦',
+    'Spades': '♠',
+    'Clubs': '♣'
+}
+
+
+def card_id(suit: str, value: str) -> int:
+    return SUITS.index(suit) * len(VALUES) + VALUES.index(value)
+
+
+# Card class to represent individual cards.
+# Cards are flyweights: there are exactly 52 instances, created once and shared by every
+# shoe and hand. Card(suit, value) returns the interned instance, and all derived
+# attributes (blackjack value, colour, symbol, HTML) are computed up front.
+class Card:
+    __slots__ = ("id", "suit", "value", "points", "hard", "is_ace", "color", "symbol", "html", "name")
+
+    def __new__(cls, suit: str, value: str) -> "Card":
+        card = _INTERNED.get((suit, value))
+        if card is not None:
+            return card
+        if suit not in SUITS or value not in VALUES:
+            raise ValueError(f"Unknown card: {value} of {suit}")
+        card = object.__new__(cls)
+        points = 10 if value in ['J', 'Q', 'K'] else 11 if value == 'A' else int(value)
+        color = "red" if suit in ['Hearts', 'Diamonds'] else "black"
+        symbol = SYMBOLS[suit]
+        fields = {
+            "id": card_id(suit, value),
+            "suit": suit,
+            "value": value,
+            "points": points, # Blackjack value, Ace = 11
+            "hard": 1 if value == 'A' else points, # Ace = 1
+            "is_ace": value == 'A',
+            "color": color,
+            "symbol": symbol,
+            "html": f'<div class="card {color}">{value}<br>{symbol}</div>',
+            "name": f"{value} of {suit}",
+        }
+        for name, field in fields.items():
+            object.__setattr__(card, name, field)
+        _INTERNED[(suit, value)] = card
+        return card
+
+    @staticmethod
+    def from_id(card_id: int) -> "Card":
+        return CARDS[card_id]
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Card instances are shared and immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Card instances are shared and immutable")
+
+    def __reduce__(self):
+        return (Card, (self.suit, self.value)) # Unpickles to the interned instance
+        
+    def __str__(self) -> str:
+        return self.name
+
+    def __repr__(self) -> str:
+        return f"Card({self.suit!r}, {self.value!r})"
+    
+    def get_value(self) -> int:
+        return self.points
+            
+    def get_color(self) -> str:
+        return self.color
+        
+    def get_symbol(self) -> str:
+        return self.symbol
+
+
+_INTERNED = {}
+# Every distinct card, indexed by card id
+CARDS = tuple(Card(suit, value) for suit in SUITS for value in VALUES)
@@ -0,0 +1,77 @@
+"""Checkpoints for long simulation runs.
+
+Each table of ``simulate.py --checkpoint PATH`` periodically saves everything
+its remaining rounds depend on to ``PATH.<table>``: the RNG state, the shoe
+order and cursor, the statistics so far and the number of rounds played.
+The count needs no state of its own, since a ``CardCounter`` is rebuilt from
+the restored shoe. ``--resume`` picks each table up from its file and plays
+on to the same results as a run that was never interrupted.
+
+Only plain data and the ``streaming_stats`` accumulators are pickled, so a
+checkpoint loads the same whether ``simulate`` ran as a script or a module.
+Files are replaced atomically (written beside the target, synced, then
+renamed over it), so a run killed mid-save leaves the previous checkpoint.
+"""
+import os
+import pickle
+from typing import Any, NamedTuple, Optional
+
+import numpy as np
+
+from shoe import ContinuousShuffler, Deck
+from shoe_file import ShoeReader
+
+DEFAULT_INTERVAL = 60.0 # Seconds between checkpoints
+
+
+class ShoeState(NamedTuple):
+    cards: np.ndarray # Card ids in shuffled order
+    position: int
+    rng_state: dict # Of the deck's bit generator
+    next_shoe: Optional[int] = None # Of the shoe file the deck deals from, if any
+    machine: Optional[tuple] = None # Of a continuous shuffler
+
+    @classmethod
+    def capture(cls, deck: Deck) -> "ShoeState":
+        next_shoe = deck.source.next_shoe if isinstance(deck.source, ShoeReader) else None
+        machine = deck.machine_state() if isinstance(deck, ContinuousShuffler) else None
+        return cls(deck.cards.copy(), deck.position, deck.rng.bit_generator.state, next_shoe, machine)
+
+    def restore(self, deck: Deck):
+        """Puts `deck` back in this state and rebuilds its counters' counts."""
+        deck.cards = self.cards.copy() # Not into the old array, which may be a read-only view of a shoe file
+        deck.position = self.position
+        deck.rng.bit_generator.state = self.rng_state
+        if self.next_shoe is not None:
+            deck.source.next_shoe = self.next_shoe
+        if self.machine is not None:
+            deck.restore_machine(self.machine)
+        for counter in deck.counters:
+            counter.on_shuffle(deck)
+
+
+class WorkerCheckpoint(NamedTuple):
+    entropy: int # Of the run's master SeedSequence
+    worker: int
+    rounds: int # The worker's share of the run
+    config: dict # simulate.SimulationConfig fields; a resumed run must use the same ones
+    rounds_done: int
+    shoe: ShoeState
+    stats: dict # Attributes of the simulate.SimulationStats after rounds_done rounds
+    elapsed: float # Seconds the worker has played so far, across sessions
+    history_size: int # Bytes of the worker's hand-history log, 0 without one
+
+
+def save(path: str, state: Any):
+    """Pickles `state` to `path`, replacing any previous file atomically."""
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def load(path: str) -> Any:
+    with open(path, "rb") as f:
+        return pickle.load(f)
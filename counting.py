@@ -0,0 +1,98 @@
+"""Card counting on a live shoe.
+
+A ``CardCounter`` attached to a ``Deck`` keeps the running count of every card
+dealt so far. When the shoe is shuffled the counter takes a prefix sum of its
+system's tags over the new card order, so the count after any number of deals
+is one array read at the deck's cursor: dealing itself does no counting work.
+
+``BetRamp`` turns a true count into a bet, for the counting mode of
+``simulate.py``.
+"""
+from bisect import bisect_right
+from typing import Dict, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from cards import CARDS, CARDS_PER_DECK, VALUES
+
+
+class CountingSystem(NamedTuple):
+    name: str
+    tags: Tuple[int, ...] # Tag per rank, in cards.VALUES order ('2' ... 'A')
+    balanced: bool # Balanced systems start at 0; unbalanced ones use an initial running count
+
+    def initial_count(self, num_decks: int) -> int:
+        return 0 if self.balanced else 4 - 4 * num_decks # KO convention: pivot at +4
+
+
+#                                  2  3  4  5  6  7  8   9  10   J   Q   K   A
+HI_LO = CountingSystem("Hi-Lo",    (1, 1, 1, 1, 1, 0, 0,  0, -1, -1, -1, -1, -1), True)
+KO = CountingSystem("KO",          (1, 1, 1, 1, 1, 1, 0,  0, -1, -1, -1, -1, -1), False)
+OMEGA_II = CountingSystem("Omega II", (1, 1, 2, 2, 2, 1, 0, -1, -2, -2, -2, -2, 0), True)
+
+SYSTEMS: Dict[str, CountingSystem] = {"hilo": HI_LO, "ko": KO, "omega2": OMEGA_II}
+
+
+class CardCounter:
+    """Running count, true count and penetration of the deck it is attached to, all O(1)."""
+
+    def __init__(self, system: CountingSystem, num_decks: int = 6):
+        self.system = system
+        self.num_decks = num_decks
+        self.initial = system.initial_count(num_decks)
+        # Tag of every card id, so a whole shoe is tagged with one fancy index
+        self.card_tags = np.array([system.tags[VALUES.index(card.value)] for card in CARDS], dtype=np.int8)
+        self.deck = None
+        self.prefix = np.zeros(1, dtype=np.int32) # prefix[n] = sum of tags of the first n cards
+
+    def on_shuffle(self, deck):
+        """Called by the deck with its new card order."""
+        self.deck = deck
+        self.prefix = np.zeros(deck.cards.size + 1, dtype=np.int32)
+        np.cumsum(self.card_tags[deck.cards], dtype=np.int32, out=self.prefix[1:])
+
+    @property
+    def cards_seen(self) -> int:
+        return self.deck.position if self.deck is not None else 0
+
+    @property
+    def running_count(self) -> int:
+        return self.initial + self.prefix.item(self.cards_seen)
+
+    @property
+    def decks_remaining(self) -> float:
+        if self.deck is None:
+            return float(self.num_decks)
+        return max(len(self.deck), 1) / CARDS_PER_DECK
+
+    @property
+    def true_count(self) -> float:
+        """Running count per remaining deck (for unbalanced systems this is informational only)."""
+        return self.running_count / self.decks_remaining
+
+    @property
+    def penetration(self) -> float:
+        """Fraction of the shoe dealt since the last shuffle."""
+        return self.cards_seen / self.deck.cards.size if self.deck is not None else 0.0
+
+
+class BetRamp:
+    """Maps a true count to a bet: the bet of the highest step at or below the count, else `min_bet`."""
+
+    def __init__(self, steps: Sequence[Tuple[float, int]], min_bet: int):
+        ordered = sorted(steps)
+        self.thresholds = [count for count, _ in ordered]
+        self.bets = [min_bet] + [bet for _, bet in ordered]
+        self.min_bet = min_bet
+
+    @classmethod
+    def parse(cls, spec: str, min_bet: int) -> "BetRamp":
+        """Builds a ramp from text such as "1:20,2:40,3:80" (true count:bet)."""
+        steps = []
+        for step in spec.split(","):
+            count, bet = step.split(":")
+            steps.append((float(count), int(bet)))
+        return cls(steps, min_bet)
+
+    def bet_for(self, true_count: float) -> int:
+        return self.bets[bisect_right(self.thresholds, true_count)]
@@ -0,0 +1,140 @@
+"""Exact probabilities of the dealer's final hand.
+
+Given the dealer upcard and the composition of the unseen cards, computes the
+chance the dealer finishes on 17, 18, 19, 20, 21, busts or has Blackjack,
+following ``BlackjackGame.dealer_play`` (hit soft 17, stand on hard 17 and
+soft 18). The recursion is memoized on a canonical composition key with
+bounded LRU caches, so repeated queries during a shoe are dictionary hits.
+
+A composition is a 10-tuple of remaining card counts indexed by hard value
+minus one: index 0 is Aces, index 8 is nines and index 9 is every ten-value
+card.
+"""
+from functools import lru_cache
+from typing import NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from cards import CARDS, CARDS_PER_DECK, Card
+
+Composition = Tuple[int, ...]
+
+NUM_RANKS = 10 # Ace, 2-9, ten-value
+CACHE_SIZE = 1 << 16 # Recursion states kept per process
+QUERY_CACHE_SIZE = 4096 # Whole-distribution answers kept per process
+
+# Composition index of each card id
+RANK_INDEX = np.array([card.hard - 1 for card in CARDS], dtype=np.uint8)
+
+
+class DealerOutcome(NamedTuple):
+    p17: float
+    p18: float
+    p19: float
+    p20: float
+    p21: float # 21 with three or more cards
+    bust: float
+    blackjack: float
+
+    def total(self, value: int) -> float:
+        """Probability of finishing on `value` (17-21)."""
+        return self[value - 17]
+
+
+def full_shoe(num_decks: int = 6) -> Composition:
+    """Composition of a freshly shuffled shoe."""
+    per_deck = CARDS_PER_DECK // 13
+    return tuple([per_deck * num_decks] * 9 + [per_deck * 4 * num_decks])
+
+
+def composition_of(card_ids: Sequence[int]) -> Composition:
+    """Composition of a run of card ids, e.g. the undealt part of a shoe."""
+    counts = np.bincount(RANK_INDEX[np.asarray(card_ids, dtype=np.intp)], minlength=NUM_RANKS)
+    return tuple(int(c) for c in counts)
+
+
+def remove_card(composition: Composition, card: Card) -> Composition:
+    """The composition with one seen card taken out."""
+    counts = list(composition)
+    counts[card.hard - 1] -= 1
+    return tuple(counts)
+
+
+def _draw(composition: Composition, index: int) -> Composition:
+    return composition[:index] + (composition[index] - 1,) + composition[index + 1:]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _finish(hard: int, has_ace: bool, composition: Composition) -> Tuple[float, ...]:
+    """Outcome distribution (17, 18, 19, 20, 21, bust) of a dealer hand that is past its first two cards."""
+    if hard > 21:
+        return (0.0, 0.0, 0.0, 0.0, 0.0, 1.0)
+    total = hard + 10 if has_ace and hard + 10 <= 21 else hard
+    soft = total != hard
+    if total >= 18 or (total == 17 and not soft):
+        result = [0.0] * 6
+        result[total - 17] = 1.0
+        return tuple(result)
+
+    remaining = sum(composition)
+    if remaining == 0:
+        # An empty shoe is replaced by a fresh one, as Deck.deal does
+        return _finish(hard, has_ace, full_shoe())
+    result = [0.0] * 6
+    for index, count in enumerate(composition):
+        if count:
+            sub = _finish(hard + index + 1, has_ace or index == 0, _draw(composition, index))
+            weight = count / remaining
+            for k in range(6):
+                result[k] += weight * sub[k]
+    return tuple(result)
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _probabilities(upcard: int, composition: Composition, given_no_blackjack: bool) -> DealerOutcome:
+    remaining = sum(composition)
+    if remaining == 0:
+        return _probabilities(upcard, full_shoe(), given_no_blackjack)
+    result = [0.0] * 7
+    excluded = 0.0
+    for index, count in enumerate(composition):
+        if not count:
+            continue
+        weight = count / remaining
+        hole = index + 1
+        if {upcard, hole} == {1, 10}:
+            if given_no_blackjack:
+                excluded += weight
+            else:
+                result[6] += weight
+            continue
+        sub = _finish(upcard + hole, upcard == 1 or hole == 1, _draw(composition, index))
+        for k in range(6):
+            result[k] += weight * sub[k]
+    if given_no_blackjack and excluded:
+        result = [p / (1.0 - excluded) for p in result]
+    return DealerOutcome(*result)
+
+
+def dealer_probabilities(upcard, composition: Composition, given_no_blackjack: bool = False) -> DealerOutcome:
+    """Distribution of the dealer's final hand.
+
+    `upcard` is a Card or its hard value (Ace = 1, ten-value = 10).
+    `composition` is every card the player cannot see, so it still includes
+    the dealer's hole card. With `given_no_blackjack` the distribution is
+    conditioned on the dealer not holding a natural, as after an insurance
+    check against an Ace.
+    """
+    if isinstance(upcard, Card):
+        upcard = upcard.hard
+    return _probabilities(upcard, tuple(composition), given_no_blackjack)
+
+
+def cache_info():
+    """Hit/miss statistics of the recursion and query caches."""
+    return {"states": _finish.cache_info(), "queries": _probabilities.cache_info()}
+
+
+def clear_cache():
+    _finish.cache_clear()
+    _probabilities.cache_clear()
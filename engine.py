@@ -0,0 +1,744 @@
+"""Blackjack rules engine.
+
+Pure game logic with no UI dependencies. Anything the player should be told
+(toasts, warnings, results) is published as a ``GameEvent`` through the
+``on_event`` hook, so the Streamlit front end and headless callers such as
+simulators can share the same rules.
+"""
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from cards import Card
+from events import EventHandler, GameEvent
+from hand import Hand
+from hand_values import hand_value
+import history
+from shoe import ContinuousShuffler, Deck, ShoeSource
+from table_state import SeatsView, TableState
+from turns import TurnQueue
+
+
+# Game class to manage the game state
+class BlackjackGame:
+    def __init__(self, num_players=1, rng: Optional[np.random.Generator] = None, compact: bool = False,
+                 double_after_split: bool = False, shoe_source: Optional[ShoeSource] = None,
+                 penetration: Optional[float] = None, continuous_shuffle: bool = False):
+        self.num_players = num_players
+        self.rng = rng if rng is not None else np.random.default_rng() # Every deck this game uses shuffles from it
+        self.shoe_source = shoe_source # Shuffled shoes (shoe.ShoePool, shoe_file.ShoeReader) instead of shuffling inline
+        self.double_after_split = double_after_split # Table rule: may split hands double down
+        # Shoe model: a cut card at this fraction of the shoe, or a continuous shuffling machine
+        self.penetration = penetration
+        self.continuous_shuffle = continuous_shuffle
+        self.on_event: Optional[EventHandler] = None # Observer hook for UI notifications
+        self.deck = self._new_deck()
+        self._discards_returned = True # Whether the cards on the table are back in a continuous shuffler
+        self.dealer_hand: Hand = Hand()
+        # Player state now tracks multiple hands per player
+        # Outer list: Players, Inner list: Hands for that player. Each Hand carries its own bet and stand/bust state;
+        # between rounds hand 0 holds the bet the player has chosen for the next deal.
+        self.player_hands: List[List[Hand]] = [[Hand(bet=5)] for _ in range(num_players)]
+        self.player_balances: List[int] = [50] * num_players
+        self.dealer_balance: int = 10000
+        self.current_player_index: int = 0
+        self.current_hand_indices: List[int] = [0] * num_players # Tracks active hand index for each player
+        self.player_split_flags: List[bool] = [False] * num_players # Tracks if player has split this round
+        self.player_messages: List[str] = [""] * num_players # Overall message per player for now
+        self.game_over: bool = True
+        self.dealer_turn_active: bool = False
+        # Insurance state (remains per player)
+        self.insurance_offered: bool = False
+        self.player_insurance_bets: List[int] = [0] * num_players
+        self.player_made_insurance_decision: List[bool] = [False] * num_players
+        self.turns = TurnQueue() # Hands still to play this round, in turn order
+        self.history: Optional[history.HandHistoryWriter] = None # Optional hand-history log
+        self._recorded_balances: List[int] = []
+        # Optional NumPy-backed seat storage for large tables; see table_state
+        self.table: Optional[TableState] = None
+        if compact:
+            self._use_table(TableState(num_players))
+
+    def _new_deck(self) -> Deck:
+        if self.continuous_shuffle:
+            deck = ContinuousShuffler(self.rng)
+        else:
+            deck = Deck(self.rng, self.shoe_source, self.penetration)
+        deck.on_event = self.forward_event # Route shoe notifications through the game
+        return deck
+
+    def return_discards(self):
+        """Puts the last round's cards back into a continuous shuffler; done once per round, before the deal."""
+        if self.deck.returns_discards and not self._discards_returned:
+            hands = [self.dealer_hand] + [hand for seat_hands in self.player_hands for hand in seat_hands]
+            self.deck.discard([card.id for hand in hands for card in hand])
+        self._discards_returned = True
+
+    def _use_table(self, table: TableState):
+        """Stores the seats in `table`. The per-seat attributes become views of its arrays,
+        so the rest of the game (and the UI) keeps using them unchanged."""
+        self.table = table
+        self.player_hands = SeatsView(table)
+        self.player_balances = table.balances
+        self.player_split_flags = table.split_flags
+        self.player_insurance_bets = table.insurance_bets
+        self.player_made_insurance_decision = table.insurance_decided
+
+    def emit(self, kind: str, message: str, icon: str = "", pause: float = 0.0):
+        """Publishes a notification to the observer, if one is attached. Headless games stay silent."""
+        if self.on_event is not None:
+            self.on_event(GameEvent(kind, message, icon, pause))
+
+    def forward_event(self, event: GameEvent):
+        """Passes on an event published by a component such as the shoe."""
+        if self.on_event is not None:
+            self.on_event(event)
+
+    # --- Hand history ---
+
+    def _record_card(self, seat: int, hand_idx: int, card: Card):
+        if self.history is not None:
+            self.history.card(seat, hand_idx, card.id)
+
+    def _record_action(self, action: int, hand_idx: Optional[int] = None):
+        if self.history is not None:
+            seat = self.current_player_index
+            self.history.action(seat, self.current_hand_indices[seat] if hand_idx is None else hand_idx, action)
+
+    def _record_settlements(self):
+        """Logs every balance that changed since the last call, and the end of the round."""
+        if self.history is None:
+            return
+        balances = list(self.player_balances) + [self.dealer_balance]
+        for seat, (old, new) in enumerate(zip(self._recorded_balances, balances)):
+            if old != new:
+                self.history.settle(seat if seat < self.num_players else history.DEALER_SEAT, new)
+        self._recorded_balances = balances
+        if self.game_over:
+            self.history.round_end()
+
+    def calculate_hand_value(self, hand: Iterable[Card]) -> Tuple[List[int], bool]:
+        """Every valid total of the hand, ascending, and whether it is not bust.
+        A busted hand returns just its lowest total. Values come from the precomputed table."""
+        value = hand.value if isinstance(hand, Hand) else hand_value(hand)
+        return list(value.values), not value.bust
+
+    def get_hand_display_value(self, hand: Iterable[Card]) -> str:
+        return (hand.value if isinstance(hand, Hand) else hand_value(hand)).display
+
+    def prepare_deal(self):
+        """Readies the shoe for the next deal, reshuffling it if that deal would. Callers that size
+        bets on the count call this first, so the count is the one the cards will be dealt from.
+        deal_initial_cards calls it too; a second call before the deal does nothing."""
+        self.return_discards()
+
+        # Ensure deck has enough cards
+        min_cards_needed = self.num_players * 2 + 2 + 10 # Players + Dealer + Buffer
+        if self.deck.cut_card_reached:
+            self.emit("warning", "Cut card reached, reshuffling shoe...", pause=self.deck.reshuffle_pause)
+            self.deck.reset_deck()
+        elif len(self.deck) < min_cards_needed:
+            self.emit("warning", "Reshuffling shoe before new deal...", pause=self.deck.reshuffle_pause)
+            self.deck.reset_deck()
+
+    def deal_initial_cards(self):
+        # Read the bets placed before dealing
+        initial_bets = [self.player_hands[i][0].bet for i in range(self.num_players)]
+
+        self.prepare_deal()
+
+        # Reset player hand structures for the new round
+        if self.table is not None:
+            self.table.start_round(initial_bets) # Also clears split and insurance state
+        else:
+            self.player_hands = [[Hand(bet=bet)] for bet in initial_bets] # Use the bets placed
+            self.player_split_flags = [False] * self.num_players # Reset split status
+        self.current_hand_indices = [0] * self.num_players # Start at the first hand
+        self.player_messages = [""] * self.num_players # Clear previous messages
+
+        if self.history is not None:
+            self.history.round_start(initial_bets)
+            # Every round opens with all balances, so it can be replayed on its own
+            for seat, balance in enumerate(self.player_balances):
+                self.history.settle(seat, balance)
+            self.history.settle(history.DEALER_SEAT, self.dealer_balance)
+            self._recorded_balances = list(self.player_balances) + [self.dealer_balance]
+
+        # Deal cards
+        self.dealer_hand = Hand([self.deck.deal(), self.deck.deal()])
+        self._discards_returned = False
+        if self.table is not None and len(self.deck) >= 2 * self.num_players:
+            self.table.deal_initial(self.deck.deal_ids(2 * self.num_players)) # Same order as the loop below
+        else:
+            for i in range(self.num_players):
+                self.player_hands[i][0].append(self.deck.deal())
+                self.player_hands[i][0].append(self.deck.deal())
+        if self.history is not None:
+            for card in self.dealer_hand:
+                self._record_card(history.DEALER_SEAT, 0, card)
+            for i in range(self.num_players):
+                for card in self.player_hands[i][0]:
+                    self._record_card(i, 0, card)
+            
+        self.current_player_index = 0
+        self.game_over = False
+        self.dealer_turn_active = False
+        
+        # Reset insurance state for new hand
+        self.insurance_offered = False
+        if self.table is None:
+            self.player_insurance_bets = [0] * self.num_players
+            self.player_made_insurance_decision = [False] * self.num_players
+
+        # Check dealer upcard for insurance offer condition
+        dealer_upcard = self.dealer_hand[0] # The visible card
+        offer_insurance_on_ace = dealer_upcard.value == 'A'
+
+        self.turns.start(self.player_hands)
+        if offer_insurance_on_ace: # Only offer insurance if dealer shows Ace
+             self.insurance_offered = True
+             self.emit("toast", f"Dealer showing Ace. Insurance offered!", icon="❓")
+             self.current_player_index = 0 # Start insurance decisions from player 0
+        else:
+             # No insurance offered, check player BJs (on their initial hand) and set the first turn
+             self.check_player_blackjacks() # Checks hand [0]
+             self.start_player_turns()
+        self._record_settlements()
+
+    def check_player_blackjacks(self):
+        """Checks for player Blackjacks ONLY. Assumes dealer does NOT have BJ.
+           Called after insurance is declined/resolved negatively, or if insurance wasn't offered.
+        """
+        if self.table is not None:
+            payouts = self.table.pay_blackjacks()
+            self.dealer_balance -= int(payouts.sum())
+            for i in np.flatnonzero(payouts).tolist():
+                self.player_messages[i] = f"Player {i+1}: Blackjack! Wins £{payouts[i]}!"
+                self.emit("success", self.player_messages[i])
+            all_players_done = self.table.first_hands_finished()
+        else:
+            all_players_done = self._pay_blackjacks()
+
+        # If all players had Blackjack, the game is over
+        if all_players_done:
+            self.game_over = True
+            self.dealer_turn_active = False # No dealer turn needed
+
+    def _pay_blackjacks(self) -> bool:
+        """Pays and stands each unfinished first hand that is a Blackjack; True if no first hand is left to play."""
+        all_players_done = True
+        for i in range(self.num_players):
+            hand = self.player_hands[i][0]
+            if hand.finished:
+                continue # Skip players already finished (e.g., from split if implemented)
+                
+            if hand.blackjack:
+                hand.stood = True # Player with BJ stands automatically
+                # Since we assume dealer doesn't have BJ here, player BJ wins
+                win_amount = int(hand.bet * 1.5)
+                self.player_messages[i] = f"Player {i+1}: Blackjack! Wins £{win_amount}!"
+                self.player_balances[i] += win_amount
+                self.dealer_balance -= win_amount
+                self.emit("success", self.player_messages[i]) # Show immediate BJ win message
+            else:
+                all_players_done = False # At least one player needs to play
+        return all_players_done
+
+    def start_player_turns(self):
+        """Gives the turn to the first hand still to play once Blackjacks are settled, or ends the players' phase."""
+        if self.game_over:
+            return
+        turn = self.turns.next()
+        if turn is not None:
+            self.current_player_index, self.current_hand_indices[turn[0]] = turn
+        else:
+            self.end_player_turns()
+
+    def advance_turn(self, check_dealer_turn=True):
+        """Moves to the next playable hand for the current player, or to the next player, or triggers the dealer's turn.
+        The turn queue has already dropped finished hands, so this is O(1) amortised."""
+        player_idx = self.current_player_index
+        turn = self.turns.next()
+        if turn is not None:
+            next_player_idx, next_hand_idx = turn
+            self.current_player_index = next_player_idx
+            self.current_hand_indices[next_player_idx] = next_hand_idx
+            if next_player_idx == player_idx:
+                self.emit("toast", f"Player {player_idx + 1}: Now playing Hand {next_hand_idx + 1}", icon="✋")
+            else:
+                self.emit("toast", f"Player {next_player_idx + 1}'s turn (Hand {next_hand_idx + 1}).", icon="👤")
+            # Rerun needed to update UI for the next hand; the button click that triggered advance_turn handles it
+            return
+
+        # No hands left to play
+        if check_dealer_turn:
+            self.end_player_turns()
+
+    def end_player_turns(self):
+        """Every player hand is finished: the dealer plays if any hand is still standing, otherwise the round is over."""
+        if self.turns.dealer_needed:
+            # At least one player hand finished without busting, dealer needs to play
+            self.emit("toast", "All players done. Dealer's turn!", icon="🤖")
+            self.dealer_turn_active = True # Signal dealer turn in main loop
+        else:
+            # Every player hand busted out or was a natural, already paid
+            self.emit("toast", "No hands left for the dealer to beat.", icon="💥")
+            self.game_over = True
+            self.dealer_turn_active = False
+
+    def hit(self):
+        player_idx = self.current_player_index
+        hand_idx = self.current_hand_indices[player_idx]
+        
+        hand = self.player_hands[player_idx][hand_idx]
+        
+        # Check if player is allowed to hit this hand
+        if hand.finished:
+             self.emit("warning", f"Player {player_idx + 1} Hand {hand_idx + 1} cannot hit now.")
+             return
+
+        self._record_action(history.HIT)
+        new_card = self.deck.deal()
+        hand.append(new_card) # Updates the running total
+        self._record_card(player_idx, hand_idx, new_card)
+        
+        self.emit("toast", f"Player {player_idx + 1} Hand {hand_idx + 1} draws: {new_card}", icon="🃏", pause=1.0) 
+
+        if hand.busted: # Player busts on this hand
+            bust_value = hand.total
+            # Update message for this specific hand? For now, keep general player message.
+            self.player_messages[player_idx] = f"Player {player_idx + 1} Hand {hand_idx + 1}: Busts with {bust_value}!"
+            hand.stood = True # Busting means they are done with this hand
+            # Adjust balances immediately on bust
+            self.dealer_balance += hand.bet
+            self.player_balances[player_idx] -= hand.bet
+            self.advance_turn() # Move to next hand/player
+            self._record_settlements()
+
+    def stand(self):
+        player_idx = self.current_player_index
+        hand_idx = self.current_hand_indices[player_idx]
+
+        hand = self.player_hands[player_idx][hand_idx]
+
+        # Check if player is allowed to stand this hand
+        if hand.finished:
+             self.emit("warning", f"Player {player_idx + 1} Hand {hand_idx + 1} cannot stand now.")
+             return
+             
+        self.emit("toast", f"Player {player_idx + 1} Hand {hand_idx + 1} stands.", icon="🛑")
+        self._record_action(history.STAND)
+        hand.stood = True
+        self.advance_turn() # Move to next hand/player
+        self._record_settlements()
+                
+    def double_down(self):
+        player_idx = self.current_player_index
+        hand_idx = self.current_hand_indices[player_idx]
+        current_hand = self.player_hands[player_idx][hand_idx]
+        current_bet = current_hand.bet
+
+        # Check conditions for this hand
+        can_double = (
+            len(current_hand) == 2 and
+            # Can only double down on first two cards of any hand (split or initial)
+            self.player_balances[player_idx] >= current_bet and # Need enough balance to double the bet for THIS hand
+            not current_hand.finished and
+            (self.double_after_split or not self.player_split_flags[player_idx]) # No double down after split by default
+        )
+
+        if can_double:
+            self.emit("toast", f"Player {player_idx + 1} Hand {hand_idx + 1} doubles down!", icon="💰")
+            self._record_action(history.DOUBLE)
+            # Double the bet for this specific hand; it is settled in full like any other bet
+            current_hand.bet *= 2
+            current_hand.doubled = True
+            
+            # Hit happens automatically
+            new_card = self.deck.deal()
+            current_hand.append(new_card)
+            self._record_card(player_idx, hand_idx, new_card)
+            self.emit("toast", f"Player {player_idx + 1} Hand {hand_idx + 1} draws: {new_card}", icon="🃏", pause=1.0)  # Pause after double down hit
+
+            current_hand.stood = True # Player is done with this hand after double down
+
+            if current_hand.busted: # Player busts on double down
+                bust_value = current_hand.total
+                self.player_messages[player_idx] = f"Player {player_idx + 1} Hand {hand_idx + 1}: Busts with {bust_value} on double down!"
+                # Adjust balances immediately on bust, for the full doubled bet
+                self.dealer_balance += current_hand.bet
+                self.player_balances[player_idx] -= current_hand.bet
+            else:
+                # Display final hand value? Let UI handle it.
+                 pass 
+            
+            self.advance_turn() # Move to next hand/player
+            self._record_settlements()
+        else:
+             # Give more specific feedback
+            reason = ""
+            if len(current_hand) != 2: reason = "Can only double on first two cards."
+            elif self.player_balances[player_idx] < current_bet: reason = f"Need £{current_bet} more to double."
+            elif current_hand.finished: reason = "Hand finished."
+            elif self.player_split_flags[player_idx]: reason = "Cannot double down after splitting."
+            else: reason = "Double down not allowed now."
+            self.emit("warning", f"Player {player_idx + 1} Hand {hand_idx + 1}: Cannot double down. {reason}")
+
+    def split(self):
+        player_idx = self.current_player_index
+        hand_idx = self.current_hand_indices[player_idx]
+        
+        # --- Validity Checks ---
+        current_hand = self.player_hands[player_idx][hand_idx]
+        original_bet = current_hand.bet
+        player_balance = self.player_balances[player_idx]
+        is_initial_hand = (hand_idx == 0) # Can only split the first hand dealt
+        has_split_already = self.player_split_flags[player_idx] # Simplification: No re-splitting allowed
+        can_afford = player_balance >= original_bet
+        correct_num_cards = len(current_hand) == 2
+        already_finished = current_hand.finished
+        
+        cards_match = False
+        if correct_num_cards:
+            cards_match = current_hand[0].get_value() == current_hand[1].get_value()
+ 
+        can_split = (is_initial_hand and 
+                       not has_split_already and 
+                       can_afford and 
+                       correct_num_cards and 
+                       cards_match and
+                       not already_finished)
+ 
+        if not can_split:
+            # Provide more specific feedback if possible
+            if not is_initial_hand: reason = "Can only split the initial hand."
+            elif has_split_already: reason = "Cannot re-split."
+            elif not correct_num_cards: reason = "Can only split a 2-card hand."
+            elif not cards_match: reason = "Cards must have the same value to split."
+            elif not can_afford: reason = f"Need £{original_bet} more to split."
+            elif already_finished: reason = "Cannot split a finished hand."
+            else: reason = "Split not allowed."
+            self.emit("warning", f"Player {player_idx + 1}: Cannot split. {reason}")
+            return
+ 
+        # --- Perform Split --- 
+        self.emit("toast", f"Player {player_idx + 1} splits!", icon="✂️")
+        self._record_action(history.SPLIT)
+        self.player_split_flags[player_idx] = True # Mark that player has split; each hand settles its own bet
+ 
+        # Get the cards
+        card1 = current_hand[0]
+        card2 = current_hand[1]
+ 
+        if self.table is not None:
+            new_hand_idx = self.table.split(player_idx, hand_idx)
+            first_hand = self.player_hands[player_idx][hand_idx]
+            second_hand = self.player_hands[player_idx][new_hand_idx]
+        else:
+            # Add the new hand, with its own copy of the bet
+            first_hand = Hand([card1], bet=original_bet, from_split=True)
+            second_hand = Hand([card2], bet=original_bet, from_split=True) # New hand starts with card2
+            self.player_hands[player_idx].append(second_hand)
+            new_hand_idx = len(self.player_hands[player_idx]) - 1 # Index of the newly added hand
+ 
+            # Replace the original hand
+            self.player_hands[player_idx][hand_idx] = first_hand
+        
+        # Add clarification toast
+        self.emit("toast", f"Hand {hand_idx + 1} starts with {card1}, Hand {new_hand_idx + 1} starts with {card2}", icon="✨", pause=0.8)  # Short pause to see the message
+ 
+        # Deal one card to each new hand
+        self.emit("toast", "Dealing to split hands...", icon="🃏", pause=0.5)
+        new_card_1 = self.deck.deal()
+        first_hand.append(new_card_1)
+        self._record_card(player_idx, hand_idx, new_card_1)
+        self.emit("toast", f"Player {player_idx+1} Hand {hand_idx+1} gets: {new_card_1}", icon="🃏", pause=0.8)
+         
+        new_card_2 = self.deck.deal()
+        second_hand.append(new_card_2)
+        self._record_card(player_idx, new_hand_idx, new_card_2)
+        self.emit("toast", f"Player {player_idx+1} Hand {new_hand_idx+1} gets: {new_card_2}", icon="🃏", pause=0.8)
+         
+        # --- Handle Special Cases (Aces / Blackjacks) --- 
+        is_ace_split = (card1.value == 'A')
+ 
+        if is_ace_split:
+            self.emit("toast", "Splitting Aces! Each hand gets one card and stands.", icon="⚠️")
+            first_hand.stood = True
+            second_hand.stood = True
+            # Both hands are over; the turn moves on below
+        else:
+            # Check for Blackjack on first hand (not possible on Ace split)
+            if first_hand.blackjack:
+                self.emit("success", f"Player {player_idx + 1} Hand {hand_idx + 1}: Blackjack!")
+                first_hand.stood = True
+             
+            # Check for Blackjack on second hand
+            if second_hand.blackjack:
+                self.emit("success", f"Player {player_idx + 1} Hand {new_hand_idx + 1}: Blackjack!")
+                second_hand.stood = True
+         
+        # The new hand plays straight after the current one
+        self.turns.add_split(player_idx, new_hand_idx)
+        if first_hand.finished:
+            self.advance_turn() # Split Aces (or a split Blackjack) leave nothing to play on this hand
+        self._record_settlements()
+
+    def dealer_play(self):
+        # (No changes needed in the core hitting logic itself)
+        # --- Dealer hitting logic remains the same ---
+        while True:
+            value = self.dealer_hand.value # Highest valid total, or the bust total
+            
+            # Stand on soft 18 or higher, hard 17 or higher, or if busted
+            if value.bust or value.total >= 18 or (value.total == 17 and not value.soft): 
+                if not value.bust:
+                    self.emit("toast", f"Dealer stands on {value.display}.", icon="🛑")
+                # Bust message handled by evaluate_winner or total display
+                break # Exit loop
+
+            # Hit condition (soft 17 or less)
+            self.emit("toast", "Dealer hits...", icon="🃏")
+            # time.sleep(1) # Optional short delay between dealer hits
+            new_card = self.deck.deal()
+            self.dealer_hand.append(new_card)
+            self._record_card(history.DEALER_SEAT, 0, new_card)
+            self.emit("toast", f"Dealer draws: {new_card}", icon="🃏", pause=1.0) # Still show toast for info
+
+            # Check if dealer busted with the new card - loop condition handles this
+            if self.dealer_hand.busted:
+                # Bust is implicitly shown by the total changing to "Bust (value)"
+                # evaluate_winner will set the final game message
+                break # Stop playing if dealer busts
+
+        # Don't set dealer_turn_active = False here, evaluate_winner does it.
+        # No need to rerun here, main script loop handles it via evaluate_winner
+
+    def evaluate_winner(self):
+        # Dealer should have finished playing before this is called
+        dealer = self.dealer_hand.value
+        dealer_value = dealer.total
+        dealer_display_value = dealer.display # Final string representation, "Bust (n)" if busted
+        is_dealer_busted = dealer.bust
+
+        # Reset player messages to build results for this round
+        self.player_messages = [""] * self.num_players
+
+        # Compact tables settle every seat at once; the loop below then only writes the messages
+        settle_each = self.table is None
+        if not settle_each:
+            net = self.table.settle(dealer_value, is_dealer_busted)
+            self.dealer_balance -= int(net.sum())
+
+        # Evaluate each hand for each player vs dealer
+        for player_idx in range(self.num_players):
+            player_round_message = f"Player {player_idx + 1} Results: "
+            num_hands = len(self.player_hands[player_idx])
+            
+            for hand_idx in range(num_hands):
+                hand_message = f"Hand {hand_idx + 1}: "
+                player_hand = self.player_hands[player_idx][hand_idx]
+                bet = player_hand.bet
+                is_busted = player_hand.busted
+
+                if is_busted:
+                    # Message was set when busted, balance adjusted. Just note it here.
+                    # Player already lost `bet` when they busted.
+                    hand_message += f"Busted (-£{bet}). " 
+                    player_round_message += hand_message
+                    continue # Evaluate next hand
+                if player_hand.blackjack and not player_hand.from_split:
+                    # A natural was paid 3:2 by check_player_blackjacks; it is not compared again
+                    hand_message += f"Blackjack (+£{(bet * 3) // 2}). "
+                    player_round_message += hand_message
+                    continue
+
+                # Hand is not busted, get its value
+                player = player_hand.value # Never bust here; busted hands were skipped above
+                player_value = player.total
+                player_display = player.display
+                # is_player_bj = player_display == "Blackjack!" # Use numeric value comparison primarily
+
+                # --- Compare hand against dealer --- 
+                if is_dealer_busted:
+                    # Player wins unless busted (handled above)
+                    hand_message += f"Wins £{bet}! (Dealer busts). "
+                    if settle_each:
+                        self.player_balances[player_idx] += bet
+                        self.dealer_balance -= bet
+                elif player_value > dealer_value:
+                    hand_message += f"Wins £{bet}! ({player_display} vs {dealer_display_value}). "
+                    if settle_each:
+                        self.player_balances[player_idx] += bet
+                        self.dealer_balance -= bet
+                elif dealer_value > player_value:
+                    hand_message += f"Loses £{bet}. ({player_display} vs {dealer_display_value}). "
+                    # Only adjust balance here if player didn't bust (loss already applied on bust)
+                    if settle_each:
+                        self.dealer_balance += bet
+                        self.player_balances[player_idx] -= bet
+                else: # Push (player_value == dealer_value)
+                    # Handle Blackjack push specifically? Standard push is no balance change.
+                    # If player BJ vs dealer BJ, it's a push. If player 21 vs dealer 21, it's a push.
+                    hand_message += f"Push! ({player_display} vs {dealer_display_value}). "
+                    # No balance change
+
+                player_round_message += hand_message
+            
+            # Store the combined result message for the player
+            self.player_messages[player_idx] = player_round_message.strip()
+
+        self.game_over = True
+        self.dealer_turn_active = False 
+        self._record_settlements()
+        # Don't rerun here, let the main loop handle the final display update
+
+    def take_insurance(self):
+        player_idx = self.current_player_index
+        if not self.insurance_offered or self.player_made_insurance_decision[player_idx]:
+            return # Should not happen via UI, but safe check
+
+        insurance_cost = self.player_hands[player_idx][0].bet // 2 # Integer division
+        if self.player_balances[player_idx] < insurance_cost:
+             self.emit("warning", f"Player {player_idx + 1}: Not enough balance (£{self.player_balances[player_idx]}) for insurance (£{insurance_cost}).")
+             # Automatically decline if insufficient funds?
+             self.decline_insurance()
+             return
+        
+        self.player_insurance_bets[player_idx] = insurance_cost
+        self.player_made_insurance_decision[player_idx] = True
+        self.emit("toast", f"Player {player_idx + 1} takes insurance (£{insurance_cost}).", icon="🛡️")
+        self._record_action(history.INSURE, hand_idx=0)
+        self.advance_insurance_decision()
+        self._record_settlements()
+
+    def decline_insurance(self):
+        player_idx = self.current_player_index
+        if not self.insurance_offered or self.player_made_insurance_decision[player_idx]:
+            return
+        
+        self.player_insurance_bets[player_idx] = 0
+        self.player_made_insurance_decision[player_idx] = True
+        self.emit("toast", f"Player {player_idx + 1} declines insurance.", icon="❌")
+        self._record_action(history.DECLINE, hand_idx=0)
+        self.advance_insurance_decision()
+        self._record_settlements()
+
+    def advance_insurance_decision(self):
+        """Moves to the next player needing to decide on insurance, or resolves insurance if all decided."""
+        next_player_needs_decision = -1
+        for i in range(self.current_player_index + 1, self.num_players):
+            if not self.player_made_insurance_decision[i]:
+                 next_player_needs_decision = i
+                 break
+        
+        if next_player_needs_decision != -1:
+             self.current_player_index = next_player_needs_decision
+             self.emit("toast", f"Player {self.current_player_index + 1}: Take or decline insurance?", icon="❓")
+             # UI needs to update for this player
+        else:
+            # All players have made their insurance decision
+            self.emit("toast", "All insurance decisions made. Checking dealer's hole card...", icon="👀", pause=1.0)  # Pause for effect
+            self.resolve_insurance()
+
+    def resolve_insurance(self):
+        """Checks dealer BJ and settles insurance bets. Then proceeds with game."""
+        dealer_has_blackjack = self.dealer_hand.blackjack
+
+        if dealer_has_blackjack:
+            # --- Logic for Dealer having Blackjack --- 
+            self.emit("warning", "Dealer Blackjack!") 
+            # Reveal dealer's hand in the UI by marking turn potentially active or game over
+            # The hand display logic already shows full hand on game_over
+            # self.dealer_turn_active = True # Setting game_over is sufficient
+            settle_each = self.table is None
+            if not settle_each:
+                net = self.table.resolve_insurance(dealer_blackjack=True) # Also stands every first hand
+                self.dealer_balance -= int(net.sum())
+
+            for i in range(self.num_players):
+                insurance_bet = self.player_insurance_bets[i]
+                player_bet = self.player_hands[i][0].bet
+                player_bj = self.player_hands[i][0].blackjack
+                message = f"Player {i+1}: "
+                
+                # Settle insurance bet (should be 0 if declined, but handle payout if taken)
+                if insurance_bet > 0:
+                     payout = insurance_bet * 2
+                     if settle_each:
+                         self.player_balances[i] += payout 
+                         self.dealer_balance -= payout
+                     message += f"Wins £{payout} insurance. "
+                elif self.player_made_insurance_decision[i]: # Only mention insurance loss if decision was made
+                     # No message needed for declined, only if they took and lost (handled in else block)
+                     # We don't need an explicit message for declining here as the outcome
+                     # depends on the main bet vs dealer BJ.
+                     pass
+
+                # Settle original bet (vs Dealer BJ)
+                if player_bj:
+                    message += "Pushes original bet (both Blackjack)."
+                    # No change to balance for original bet
+                else:
+                    message += f"Loses original bet (£{player_bet}) vs Dealer Blackjack."
+                    # Apply loss only if player didn't have BJ
+                    if settle_each:
+                        self.player_balances[i] -= player_bet
+                        self.dealer_balance += player_bet
+                
+                self.player_messages[i] = message
+                self.player_hands[i][0].stood = True # Hand is over for everyone
+            
+            self.game_over = True
+            self.insurance_offered = False # Insurance phase is done
+            self.dealer_turn_active = False # Game is over, no more dealer turn
+            # No need to call check_player_blackjacks or advance_turn here
+            # The rerun from the button press will show the game over state
+
+        else: # Dealer does NOT have Blackjack
+             self.emit("info", "Dealer does not have Blackjack.")
+             if self.table is not None:
+                 net = self.table.resolve_insurance(dealer_blackjack=False)
+                 self.dealer_balance -= int(net.sum())
+                 for i in np.flatnonzero(net).tolist():
+                     self.emit("error", f"Player {i+1} loses £{-net[i]} insurance bet.", icon="💸")
+             else:
+                 losing_insurance_total = 0
+                 for i in range(self.num_players):
+                     insurance_bet = self.player_insurance_bets[i]
+                     if insurance_bet > 0:
+                         self.player_balances[i] -= insurance_bet
+                         self.dealer_balance += insurance_bet
+                         losing_insurance_total += insurance_bet
+                         self.emit("error", f"Player {i+1} loses £{insurance_bet} insurance bet.", icon="💸") 
+             
+             self.insurance_offered = False # Insurance phase over
+             # Now proceed with checking for player Blackjacks (since dealer didn't have one)
+             self.check_player_blackjacks() # This updates stand/bust flags for BJ players
+             
+             # If game didn't end due to all players having BJ, set up the first player's turn
+             self.start_player_turns()
+
+    def reset_game_state(self):
+        """Resets the entire game state to initial values, including balances and deck."""
+        self.emit("toast", "Resetting game state...", icon="🔄", pause=0.5) # Give a small delay for the toast message to be seen
+        self.deck = self._new_deck() # Reset and reshuffle the deck
+        self._discards_returned = True
+        self.dealer_hand: Hand = Hand()
+        # Reset player state for multiple hands
+        self.player_hands: List[List[Hand]] = [[Hand(bet=5)] for _ in range(self.num_players)] # Reset to single hand and bet
+        self.player_balances: List[int] = [50] * self.num_players
+        self.dealer_balance: int = 10000
+        self.current_player_index: int = 0
+        self.current_hand_indices: List[int] = [0] * self.num_players # Reset active hand index
+        self.player_split_flags: List[bool] = [False] * self.num_players # Reset split status
+        self.player_messages: List[str] = [""] * self.num_players
+        self.game_over: bool = True # Game is over after reset, ready for new deal
+        self.dealer_turn_active: bool = False
+        # Reset insurance state
+        self.insurance_offered: bool = False
+        self.player_insurance_bets: List[int] = [0] * self.num_players
+        self.player_made_insurance_decision: List[bool] = [False] * self.num_players
+        self.turns = TurnQueue()
+        if self.table is not None:
+            self._use_table(TableState(self.num_players))
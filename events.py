@@ -0,0 +1,13 @@
+"""Notifications published by the game engine to whoever presents the game."""
+from typing import Callable, NamedTuple
+
+
+class GameEvent(NamedTuple):
+    """A notification raised by the engine for whoever is presenting the game."""
+    kind: str # "toast", "warning", "success", "error" or "info"
+    message: str
+    icon: str = ""
+    pause: float = 0.0 # Suggested seconds a UI may hold the message on screen
+
+
+EventHandler = Callable[[GameEvent], None]
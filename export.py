@@ -0,0 +1,178 @@
+"""Columnar export of per-round results, for pandas, DuckDB and friends.
+
+``RoundExporter`` takes one row per seat per round and writes the rows in
+fixed-size chunks while the simulation runs: each chunk becomes one Parquet
+row group, or one record batch of an Arrow IPC file. Only the chunk being
+filled is kept in memory.
+
+Rows come from ``simulate.py --export`` or from a hand-history log::
+
+    python export.py hands.bin.0 --out hands.parquet
+    python export.py hands.bin.0 --out hands.arrow --chunk-rows 100000
+
+pyarrow is only needed once an exporter is created.
+
+Ranks are rank indices (Ace = 0, 2-9 = 1-8, ten-value = 9). ``card1`` and
+``card2`` are the seat's first two cards. ``payout`` is the seat's net
+result for the round. ``true_count`` is NaN when no count was kept.
+"""
+import argparse
+import os
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+import history
+from cards import CARDS
+from hand_values import hand_value
+
+# Column name and dtype, in row order
+COLUMNS: Tuple[Tuple[str, type], ...] = (
+    ("round", np.uint64),
+    ("seat", np.uint16),
+    ("bet", np.uint32),
+    ("hands", np.uint8), # 2 after a split
+    ("card1", np.uint8),
+    ("card2", np.uint8),
+    ("upcard", np.uint8),
+    ("hits", np.uint8),
+    ("doubled", np.bool_),
+    ("split", np.bool_),
+    ("insured", np.bool_),
+    ("dealer_total", np.uint8), # Final total; above 21 when the dealer busts
+    ("payout", np.int32), # Up to four bets and a half either way
+    ("true_count", np.float32),
+)
+
+DEFAULT_CHUNK_ROWS = 1 << 16
+ARROW_SUFFIXES = (".arrow", ".feather", ".ipc")
+
+
+def rank(card_id: int) -> int:
+    return CARDS[card_id].hard - 1
+
+
+class RoundExporter:
+    """Streams rows (tuples in COLUMNS order) to a Parquet or Arrow IPC file, a chunk at a time."""
+
+    def __init__(self, path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS, file_format: Optional[str] = None):
+        import pyarrow as pa
+        self._pa = pa
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.file_format = file_format or ("arrow" if path.endswith(ARROW_SUFFIXES) else "parquet")
+        self.schema = pa.schema([(name, pa.from_numpy_dtype(dtype)) for name, dtype in COLUMNS])
+        if self.file_format == "parquet":
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(path, self.schema)
+        elif self.file_format == "arrow":
+            self._writer = pa.ipc.new_file(path, self.schema)
+        else:
+            raise ValueError(f"Unknown export format: {self.file_format}")
+        self._rows: List[tuple] = []
+        self.rows_written = 0
+
+    def add(self, row: tuple):
+        self._rows.append(row)
+        if len(self._rows) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        """Writes the rows collected so far as one row group (or record batch)."""
+        if not self._rows:
+            return
+        # NumPy raises OverflowError for a Python int that does not fit its column's dtype
+        arrays = [self._pa.array(np.array(values, dtype=dtype))
+                  for (_, dtype), values in zip(COLUMNS, zip(*self._rows))]
+        batch = self._pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+        if self.file_format == "parquet":
+            self._writer.write_batch(batch, row_group_size=len(self._rows))
+        else:
+            self._writer.write_batch(batch)
+        self.rows_written += len(self._rows)
+        self._rows = []
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+    def __enter__(self) -> "RoundExporter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def worker_path(path: str, worker: int) -> str:
+    """``results.parquet`` -> ``results.3.parquet``, so the files still glob by extension."""
+    stem, suffix = os.path.splitext(path)
+    return f"{stem}.{worker}{suffix}"
+
+
+def export_history(data: bytes, exporter: RoundExporter) -> int:
+    """Adds a row per seat for every complete round of a hand-history log; returns the rounds exported."""
+    rounds = 0
+    bets: Tuple[int, ...] = ()
+    for _, record_type, payload in history.iter_records(data):
+        if record_type == history.ROUND:
+            seats, *bets = history.decode(record_type, payload)
+            opening: List[Optional[int]] = [None] * seats # Balances from the snapshot that opens the round
+            closing: List[int] = [0] * seats
+            first_cards: List[List[int]] = [[] for _ in range(seats)]
+            hits = [0] * seats
+            doubled = [False] * seats
+            split = [False] * seats
+            insured = [False] * seats
+            dealer: List[int] = []
+        elif record_type == history.SETTLE:
+            seat, balance = history.decode(record_type, payload)
+            if seat != history.DEALER_SEAT:
+                if opening[seat] is None:
+                    opening[seat] = balance
+                closing[seat] = balance
+        elif record_type == history.CARD:
+            seat, _, card_id = history.decode(record_type, payload)
+            if seat == history.DEALER_SEAT:
+                dealer.append(card_id)
+            elif len(first_cards[seat]) < 2:
+                first_cards[seat].append(card_id)
+        elif record_type == history.ACTION:
+            seat, _, action = history.decode(record_type, payload)
+            if action == history.HIT:
+                hits[seat] += 1
+            elif action == history.DOUBLE:
+                doubled[seat] = True
+            elif action == history.SPLIT:
+                split[seat] = True
+            elif action == history.INSURE:
+                insured[seat] = True
+        elif record_type == history.END:
+            dealer_total = hand_value([CARDS[card_id] for card_id in dealer]).total
+            for seat, bet in enumerate(bets):
+                card1, card2 = first_cards[seat]
+                exporter.add((rounds, seat, bet, 1 + split[seat], rank(card1), rank(card2), rank(dealer[0]),
+                              hits[seat], doubled[seat], split[seat], insured[seat], dealer_total,
+                              closing[seat] - opening[seat], np.nan))
+            rounds += 1
+    return rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a hand-history log to Parquet or Arrow IPC.")
+    parser.add_argument("log", help="Hand-history file written by history.HandHistoryWriter")
+    parser.add_argument("--out", required=True, help="Output file (.parquet, or .arrow/.feather/.ipc)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Rows per row group")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with open(args.log, "rb") as f:
+        data = f.read()
+    with RoundExporter(args.out, args.chunk_rows) as exporter:
+        rounds = export_history(data, exporter)
+    print(f"Exported {rounds:,} rounds ({exporter.rows_written:,} rows) to {args.out} "
+          f"in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""A hand of cards that keeps its own score.
+
+``Hand`` tracks its hard total and Ace count as cards are appended, so its
+value is a single table lookup (see ``hand_values``) instead of a rescan. It
+also carries the per-hand round state the game needs: the bet and whether the
+hand has stood, doubled or came from a split.
+"""
+from typing import Iterable, Iterator, List
+
+from cards import Card
+from hand_values import HAND_VALUE_TABLE, MAX_HARD_TOTAL, HandValue, lookup
+
+
+class Hand:
+    __slots__ = ("cards", "hard", "aces", "value", "bet", "stood", "doubled", "from_split")
+
+    def __init__(self, cards: Iterable[Card] = (), bet: int = 0, from_split: bool = False):
+        self.cards: List[Card] = []
+        self.hard = 0 # Total with every Ace counted as 1
+        self.aces = 0
+        self.value: HandValue = HAND_VALUE_TABLE[0][0][False]
+        self.bet = bet
+        self.stood = False # Finished: stood, doubled, busted or dealt Blackjack
+        self.doubled = False
+        self.from_split = from_split
+        for card in cards:
+            self.append(card)
+
+    def append(self, card: Card):
+        self.cards.append(card)
+        self.hard += card.hard
+        self.aces += card.is_ace
+        if self.hard <= MAX_HARD_TOTAL:
+            self.value = HAND_VALUE_TABLE[self.hard][self.aces][len(self.cards) == 2]
+        else:
+            self.value = lookup(self.hard, self.aces, len(self.cards)) # Only reached by appending to a bust hand
+
+    @property
+    def total(self) -> int:
+        return self.value.total
+
+    @property
+    def soft(self) -> bool:
+        return self.value.soft
+
+    @property
+    def busted(self) -> bool:
+        return self.value.bust
+
+    @property
+    def blackjack(self) -> bool:
+        """Ace and ten-value card as a two-card hand (split hands included, as the game shows them)."""
+        return self.value.blackjack
+
+    @property
+    def finished(self) -> bool:
+        return self.stood or self.value.bust
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def __iter__(self) -> Iterator[Card]:
+        return iter(self.cards)
+
+    def __getitem__(self, index: int) -> Card:
+        return self.cards[index]
+
+    def __bool__(self) -> bool:
+        return bool(self.cards)
+
+    def __repr__(self) -> str:
+        return f"Hand([{', '.join(str(c) for c in self.cards)}], bet={self.bet}, {self.value.display})"
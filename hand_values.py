@@ -0,0 +1,74 @@
+"""Precomputed hand values.
+
+A hand's value depends only on its hard total (every Ace counted as 1), how
+many Aces it holds and whether it is still a two-card hand. Every such state
+is tabulated once at import, so scoring a hand is a table index instead of
+enumerating Ace combinations. The engine, the simulator and the UI all read
+hand values through this module.
+"""
+from typing import List, NamedTuple, Tuple
+
+import numpy as np
+
+from cards import VALUES, Card
+
+MAX_HARD_TOTAL = 31 # Hitting a hard 21 with a ten is the largest total play reaches; larger ones are evaluated directly
+
+# Hard value (Ace = 1) of each rank index in cards.VALUES
+RANK_HARD_VALUES: Tuple[int, ...] = tuple(1 if v == 'A' else 10 if v in ('J', 'Q', 'K') else int(v) for v in VALUES)
+ACE_RANK = VALUES.index('A')
+
+
+class HandValue(NamedTuple):
+    total: int # Best total; the lowest total if busted
+    soft: bool # An Ace is being counted as 11
+    bust: bool
+    blackjack: bool # Ace and a ten-value card as a two-card hand
+    values: Tuple[int, ...] # Every total of 21 or less, ascending (just the bust total if busted)
+    display: str # Text shown in the UI, e.g. "Soft 17", "Bust (24)", "Blackjack!"
+
+
+def _evaluate(hard: int, aces: int, two_cards: bool) -> HandValue:
+    possible = [hard + 10 * i for i in range(aces + 1)]
+    valid = tuple(v for v in possible if v <= 21)
+    if not valid:
+        return HandValue(hard, False, True, False, (hard,), f"Bust ({hard})")
+    total = valid[-1]
+    if two_cards and aces == 1 and hard == 11:
+        return HandValue(21, True, False, True, valid, "Blackjack!")
+    soft = total != hard
+    return HandValue(total, soft, False, False, valid, f"Soft {total}" if soft else str(total))
+
+
+# HAND_VALUE_TABLE[hard][aces][two_cards]; states with more Aces than hard points never occur
+HAND_VALUE_TABLE: List[List[Tuple[HandValue, HandValue]]] = [
+    [(_evaluate(hard, aces, False), _evaluate(hard, aces, True)) for aces in range(MAX_HARD_TOTAL + 1)]
+    for hard in range(MAX_HARD_TOTAL + 1)
+]
+
+# The same table as arrays, indexed [hard, aces], for vectorised consumers
+BEST_TOTALS = np.array([[row[a][0].total for a in range(MAX_HARD_TOTAL + 1)] for row in HAND_VALUE_TABLE], dtype=np.int8)
+SOFT_TOTALS = np.array([[row[a][0].soft for a in range(MAX_HARD_TOTAL + 1)] for row in HAND_VALUE_TABLE], dtype=bool)
+
+
+def lookup(hard: int, aces: int, num_cards: int = 0) -> HandValue:
+    """Value of a hand state in O(1). Any list of cards has a value: states past the table are evaluated directly."""
+    if hard > MAX_HARD_TOTAL:
+        return _evaluate(hard, aces, num_cards == 2)
+    return HAND_VALUE_TABLE[hard][aces][num_cards == 2]
+
+
+def hand_state(hand: List[Card]) -> Tuple[int, int]:
+    """Hard total (Aces as 1) and Ace count of a list of cards."""
+    hard = 0
+    aces = 0
+    for card in hand:
+        hard += card.hard
+        aces += card.is_ace
+    return hard, aces
+
+
+def hand_value(hand: List[Card]) -> HandValue:
+    """Value of a list of cards."""
+    hard, aces = hand_state(hand)
+    return lookup(hard, aces, len(hand))
@@ -0,0 +1,151 @@
+"""Binary hand-history log.
+
+Every round a ``BlackjackGame`` plays can be written as an append-only stream
+of small length-prefixed records::
+
+    [length: u16][type: u8][payload: length - 1 bytes]
+
+    ROUND   seats: u16, bet per seat: u16 ...   new round with the bets placed
+    CARD    seat: u16, hand: u8, card id: u8    a card dealt (seat 65535 = dealer)
+    ACTION  seat: u16, hand: u8, action: u8     hit/stand/double/split/insure/decline
+    SETTLE  seat: u16, balance: i64             a balance after it changed (seat 65535 = dealer)
+    END                                         the round is over
+
+A round of up to MAX_SEATS seats fits in one record.
+
+Records are packed into an in-memory buffer; full buffers are handed to a
+background thread for writing, so a player action never waits on the disk.
+``replay.py`` rebuilds game state from a log.
+"""
+import queue
+import struct
+import threading
+from typing import BinaryIO, Iterator, Optional, Sequence, Tuple, Union
+
+ROUND, CARD, ACTION, SETTLE, END = 1, 2, 3, 4, 5
+DEALER_SEAT = 0xFFFF
+MAX_SEATS = (0xFFFF - 3) // 2 # Most bets a ROUND record's length can cover
+MAX_BET = 0xFFFF # Largest bet a ROUND record can hold
+
+# Action codes
+HIT, STAND, DOUBLE, SPLIT, INSURE, DECLINE = range(6)
+ACTION_NAMES = ("hit", "stand", "double", "split", "insure", "decline")
+
+_LENGTH = struct.Struct("<H")
+_TRIPLE = struct.Struct("<HBHBB") # length, type, seat, hand, card id or action
+_SETTLE = struct.Struct("<HBHq")
+_END = struct.Struct("<HB")
+_SEAT_FIELDS = struct.Struct("<HBB") # Payload of CARD and ACTION
+
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+
+class HandHistoryWriter:
+    """Buffered, append-only writer for the hand-history format.
+    Given the table's `seats`, it refuses up front a table too large to log."""
+
+    def __init__(self, target: Union[str, BinaryIO], buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 seats: Optional[int] = None):
+        if seats is not None:
+            _check_seats(seats)
+        self._file = open(target, "ab") if isinstance(target, str) else target
+        self._owns_file = isinstance(target, str)
+        self.buffer_size = buffer_size
+        self._buffer = bytearray()
+        self._pending: "queue.SimpleQueue[Optional[bytes]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- Records ---
+
+    def round_start(self, bets: Sequence[int]):
+        if len(self._buffer) >= self.buffer_size: # Checked once per round, so chunks hold whole rounds
+            self.flush()
+        _check_seats(len(bets))
+        payload = struct.pack(f"<BH{len(bets)}H", ROUND, len(bets), *bets)
+        self._buffer += _LENGTH.pack(len(payload))
+        self._buffer += payload
+
+    def card(self, seat: int, hand: int, card_id: int):
+        self._buffer += _TRIPLE.pack(_TRIPLE.size - 2, CARD, seat, hand, card_id)
+
+    def action(self, seat: int, hand: int, action: int):
+        self._buffer += _TRIPLE.pack(_TRIPLE.size - 2, ACTION, seat, hand, action)
+
+    def settle(self, seat: int, balance: int):
+        self._buffer += _SETTLE.pack(_SETTLE.size - 2, SETTLE, seat, balance)
+
+    def round_end(self):
+        self._buffer += _END.pack(1, END)
+
+    # --- Buffering ---
+
+    def flush(self):
+        """Hands the buffered records to the background writer without waiting for the disk."""
+        if not self._buffer:
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._write_loop, name="hand-history-writer", daemon=True)
+            self._thread.start()
+        self._pending.put(bytes(self._buffer))
+        self._buffer.clear()
+
+    def _write_loop(self):
+        while True:
+            chunk = self._pending.get()
+            if chunk is None:
+                break
+            self._file.write(chunk)
+        self._file.flush()
+
+    def close(self):
+        """Writes everything still buffered and closes the log."""
+        self.flush()
+        if self._thread is not None:
+            self._pending.put(None)
+            self._thread.join()
+            self._thread = None
+        else:
+            self._file.flush()
+        if self._owns_file:
+            self._file.close()
+
+    def __enter__(self) -> "HandHistoryWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _check_seats(seats: int):
+    if seats > MAX_SEATS:
+        raise ValueError(f"A hand-history log holds at most {MAX_SEATS:,} seats, not {seats:,}")
+
+
+def record_end(data: bytes, position: int) -> int:
+    """Offset just past the record starting at `position`."""
+    return position + 2 + (data[position] | data[position + 1] << 8)
+
+
+def iter_records(data: bytes) -> Iterator[Tuple[int, int, memoryview]]:
+    """Yields (offset, type, payload) for every complete record in `data`."""
+    view = memoryview(data)
+    position = 0
+    size = len(data)
+    while position + 2 <= size:
+        end = record_end(data, position)
+        if end > size:
+            break # Torn tail from an interrupted write
+        yield position, data[position + 2], view[position + 3:end]
+        position = end
+
+
+def decode(record_type: int, payload: memoryview) -> Tuple:
+    """Fields of one record, in the order listed in the module docstring."""
+    if record_type == ROUND:
+        seats = payload[0] | payload[1] << 8
+        return (seats,) + struct.unpack_from(f"<{seats}H", payload, 2)
+    if record_type in (CARD, ACTION):
+        return _SEAT_FIELDS.unpack_from(payload)
+    if record_type == SETTLE:
+        return struct.unpack_from("<Hq", payload)
+    return ()
@@ -0,0 +1,245 @@
+"""Lockstep NumPy simulation of many independent single-seat tables.
+
+Each lane is its own one-seat game with its own six-deck shoe. A call to
+``LockstepTable.play_round`` plays one round on every lane at once: dealing,
+insurance, the strategy lookup, the player's actions, the dealer's drawing
+rule and settlement are array operations over the lanes still involved in
+each step, so the Python overhead is paid per step rather than per hand.
+
+Rules and payouts are those of ``engine.BlackjackGame`` with one seat, as
+``simulate.play_round`` plays it: the dealer hits soft 17; insurance is
+offered only against an Ace and a dealer Blackjack ends the round there; a
+natural is paid 3:2 (rounded down) at once; there is no peek under a ten;
+a doubled hand is settled on twice the bet and each split hand on its own
+bet, as ``evaluate_winner`` does; split hands may not double, so a table
+generated with double after split is refused.
+Decisions come from a ``StrategyTable`` (basic strategy by default).
+
+Usage:
+    python lockstep.py --lanes 100000 --rounds 100 --seed 1
+    python lockstep.py --lanes 100000 --rounds 100 --bet 25 --strategy strategy_6d.npz
+"""
+import argparse
+import time
+from typing import NamedTuple, Optional, Union
+
+import numpy as np
+
+from cards import CARDS_PER_DECK
+from dealer_odds import RANK_INDEX
+from hand_values import BEST_TOTALS, SOFT_TOTALS
+from simulate import SimulationStats
+from strategy import DOUBLE, HIT, SPLIT, STAND, basic_strategy
+from strategy_table import ACTION_CODES, ALL_OPTIONS, HIT_STAND, NO_SPLIT, StrategyTable
+
+ACE, TEN = 0, 9 # Rank indices, as in dealer_odds and strategy_table
+MIN_CARDS = 2 + 2 + 10 # Cards a one-seat deal needs before the shoe is reshuffled (see deal_initial_cards)
+
+STAND_CODE, HIT_CODE, DOUBLE_CODE, SPLIT_CODE = (ACTION_CODES[a] for a in (STAND, HIT, DOUBLE, SPLIT))
+
+Bets = Union[int, np.ndarray]
+
+
+class RoundResults(NamedTuple):
+    """One round on every lane, as parallel arrays indexed by lane."""
+    net: np.ndarray # Player net result
+    hands: np.ndarray # Hands played (2 after a split)
+    doubled: np.ndarray
+    split: np.ndarray
+    insured: np.ndarray
+
+
+class LockstepTable:
+    def __init__(self, lanes: int, strategy: Optional[StrategyTable] = None,
+                 rng: Optional[np.random.Generator] = None, num_decks: int = 6, take_insurance: bool = False):
+        if strategy is not None and strategy.double_after_split:
+            raise ValueError("Lockstep tables play without double after split; the strategy table was generated with it")
+        self.lanes = lanes
+        self.strategy = strategy if strategy is not None else StrategyTable.from_policy(basic_strategy, num_decks=num_decks)
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.take_insurance = take_insurance # Always insure; otherwise the strategy's insurance table decides
+        one_shoe = RANK_INDEX[np.tile(np.arange(CARDS_PER_DECK), num_decks)]
+        self.shoes = np.tile(one_shoe, (lanes, 1)) # Rank index of every card, one shoe per lane
+        self.shoe_size = one_shoe.size
+        self.position = np.zeros(lanes, dtype=np.intp) # Next card of each shoe
+        self._all = np.arange(lanes)
+        self._shuffle(self._all)
+
+    def _shuffle(self, lanes: np.ndarray):
+        self.shoes[lanes] = self.rng.permuted(self.shoes[lanes], axis=1)
+        self.position[lanes] = 0
+
+    def _draw(self, lanes: np.ndarray) -> np.ndarray:
+        """Deals the next card of each lane's shoe, reshuffling any shoe that has run out."""
+        empty = lanes[self.position[lanes] >= self.shoe_size]
+        if empty.size:
+            self._shuffle(empty)
+        position = self.position[lanes]
+        self.position[lanes] = position + 1
+        return self.shoes[lanes, position]
+
+    def play_round(self, bets: Bets) -> RoundResults:
+        """Plays one round on every lane with `bets` (one amount, or one per lane)."""
+        lanes_all = self._all
+        bets = np.broadcast_to(np.asarray(bets, dtype=np.int64), (self.lanes,))
+        low = lanes_all[self.shoe_size - self.position < MIN_CARDS]
+        if low.size:
+            self._shuffle(low)
+
+        # Dealer first, then the player, as deal_initial_cards does
+        up, hole = self._draw(lanes_all), self._draw(lanes_all)
+        c1, c2 = self._draw(lanes_all), self._draw(lanes_all)
+
+        shape = (self.lanes, 2) # Two hand slots per lane: the dealt hand and one split
+        hard = np.zeros(shape, dtype=np.uint8) # Total with every Ace counted as 1
+        aces = np.zeros(shape, dtype=np.uint8)
+        num_cards = np.zeros(shape, dtype=np.uint8)
+        bet = np.zeros(shape, dtype=np.int64)
+        done = np.zeros(shape, dtype=bool) # Stood, doubled, busted or split Aces
+        busted = np.zeros(shape, dtype=bool)
+        hard[:, 0] = c1 + c2 + 2
+        aces[:, 0] = (c1 == ACE).view(np.uint8) + (c2 == ACE).view(np.uint8)
+        num_cards[:, 0] = 2
+        bet[:, 0] = bets
+        net = np.zeros(self.lanes, dtype=np.int64)
+        player_bj = (hard[:, 0] == 11) & (aces[:, 0] == 1)
+        dealer_bj = ((up == ACE) & (hole == TEN)) | ((up == TEN) & (hole == ACE))
+
+        # Insurance against an Ace; a dealer Blackjack settles the round there
+        offered = up == ACE
+        insured = offered & (self.take_insurance | self.strategy.insurance[c1, c2])
+        insurance = np.where(insured, bets // 2, 0)
+        ended = offered & dealer_bj
+        net += np.where(ended, 2 * insurance - np.where(player_bj, 0, bets), -insurance)
+        in_play = ~ended
+
+        # A natural is paid at once, and with one seat nothing is left to play
+        natural = in_play & player_bj
+        net += np.where(natural, (bets * 3) // 2, 0)
+        in_play &= ~natural
+
+        # --- Player turns ---
+        first, second = c1, c2.copy() # Strategy keys; a split hand is keyed on the pair
+        current = np.zeros(self.lanes, dtype=np.intp) # Hand being played
+        num_hands = np.ones(self.lanes, dtype=np.uint8)
+        split = np.zeros(self.lanes, dtype=bool)
+        doubled = np.zeros(self.lanes, dtype=bool)
+        initial, totals = self.strategy.initial, self.strategy.totals
+        lanes = lanes_all[in_play]
+        while lanes.size:
+            hand = current[lanes]
+            h, a = hard[lanes, hand], aces[lanes, hand]
+            f, s, u = first[lanes], second[lanes], up[lanes]
+            can_double = (num_cards[lanes, hand] == 2) & ~split[lanes] # No double after split (see __init__); balances are unlimited here
+            can_split = can_double & (f == s)
+            options = np.where(can_split, ALL_OPTIONS, np.where(can_double, NO_SPLIT, HIT_STAND))
+            soft = SOFT_TOTALS[h, a].view(np.uint8)
+            action = np.where(can_double, initial[f, s, u, options], totals[f, s, u, soft, BEST_TOTALS[h, a]])
+
+            # Split: one card of the pair per hand, one new card each; Aces (and 21s) stand
+            splitting = lanes[action == SPLIT_CODE]
+            if splitting.size:
+                pair = first[splitting]
+                split[splitting] = True
+                num_hands[splitting] = 2
+                bet[splitting, 1] = bet[splitting, 0]
+                second[splitting] = pair
+                for slot in (0, 1):
+                    card = self._draw(splitting)
+                    hard[splitting, slot] = pair + card + 2
+                    aces[splitting, slot] = (pair == ACE).view(np.uint8) + (card == ACE).view(np.uint8)
+                    num_cards[splitting, slot] = 2
+                    done[splitting, slot] = (pair == ACE) | ((hard[splitting, slot] == 11) & (aces[splitting, slot] == 1))
+
+            # Double: twice the bet, one card, and the hand is over
+            doubling = lanes[action == DOUBLE_CODE]
+            if doubling.size:
+                doubled[doubling] = True
+                bet[doubling, 0] *= 2
+                card = self._draw(doubling)
+                hard[doubling, 0] += card + 1
+                aces[doubling, 0] += (card == ACE).view(np.uint8)
+                num_cards[doubling, 0] += 1
+                done[doubling, 0] = True
+                bust = BEST_TOTALS[hard[doubling, 0], aces[doubling, 0]] > 21
+                busted[doubling, 0] = bust
+                net[doubling[bust]] -= bet[doubling[bust], 0] # A bust loses the doubled bet at once
+
+            # Hit: a bust loses the hand's bet at once
+            hit = action == HIT_CODE
+            hitting, hit_hand = lanes[hit], hand[hit]
+            if hitting.size:
+                card = self._draw(hitting)
+                hard[hitting, hit_hand] += card + 1
+                aces[hitting, hit_hand] += (card == ACE).view(np.uint8)
+                num_cards[hitting, hit_hand] += 1
+                bust = BEST_TOTALS[hard[hitting, hit_hand], aces[hitting, hit_hand]] > 21
+                busted[hitting, hit_hand] = bust
+                done[hitting, hit_hand] = bust
+                net[hitting[bust]] -= bet[hitting[bust], hit_hand[bust]]
+
+            stand = action == STAND_CODE
+            done[lanes[stand], hand[stand]] = True
+
+            # Lanes whose hand is over move to their split hand, or leave the loop
+            finished = done[lanes, hand]
+            move_on = finished & (hand == 0) & (num_hands[lanes] == 2) & ~done[lanes, 1]
+            current[lanes[move_on]] = 1
+            lanes = lanes[~finished | move_on]
+
+        # --- Dealer: plays only if a hand is still standing ---
+        live = ~busted & (np.arange(2) < num_hands[:, None])
+        dealing = lanes_all[in_play & live.any(axis=1)]
+        dealer_hard = (up[dealing] + hole[dealing] + 2).astype(np.uint8)
+        dealer_aces = (up[dealing] == ACE).view(np.uint8) + (hole[dealing] == ACE).view(np.uint8)
+        drawing = np.arange(dealing.size) # Positions in `dealing` still drawing
+        while drawing.size:
+            total = BEST_TOTALS[dealer_hard[drawing], dealer_aces[drawing]]
+            soft = SOFT_TOTALS[dealer_hard[drawing], dealer_aces[drawing]]
+            drawing = drawing[(total < 17) | ((total == 17) & soft)] # Hits soft 17
+            card = self._draw(dealing[drawing])
+            dealer_hard[drawing] += card + 1
+            dealer_aces[drawing] += (card == ACE).view(np.uint8)
+
+        # --- Settlement of the standing hands, as evaluate_winner ---
+        dealer_total = BEST_TOTALS[dealer_hard, dealer_aces].astype(np.int64)
+        player_total = BEST_TOTALS[hard[dealing], aces[dealing]]
+        outcome = np.where(dealer_total[:, None] > 21, 1, np.sign(player_total - dealer_total[:, None]))
+        net[dealing] += (np.where(live[dealing], outcome, 0) * bet[dealing]).sum(axis=1)
+        return RoundResults(net, num_hands, doubled, split, insured)
+
+    def run(self, rounds: int, bets: Bets, stats: Optional[SimulationStats] = None) -> SimulationStats:
+        """Plays `rounds` rounds on every lane and accumulates them into `stats`."""
+        stats = stats if stats is not None else SimulationStats()
+        bets = np.broadcast_to(np.asarray(bets, dtype=np.int64), (self.lanes,))
+        start = time.perf_counter()
+        for _ in range(rounds):
+            results = self.play_round(bets)
+            stats.record_batch(results.net, bets, results.hands)
+            stats.doubles += int(np.count_nonzero(results.doubled))
+            stats.splits += int(np.count_nonzero(results.split))
+            stats.insurance_taken += int(np.count_nonzero(results.insured))
+        stats.elapsed += time.perf_counter() - start
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate many single-seat tables in lockstep with NumPy.")
+    parser.add_argument("--lanes", type=int, default=100000, help="Independent tables played together")
+    parser.add_argument("--rounds", type=int, default=100, help="Rounds per table")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible runs")
+    parser.add_argument("--bet", type=int, default=10, help="Flat bet per round")
+    parser.add_argument("--insurance", action="store_true", help="Always take insurance when offered")
+    parser.add_argument("--strategy", default=None, help="Strategy table (.npz) from strategy_table.py")
+    args = parser.parse_args()
+
+    strategy = StrategyTable.load(args.strategy) if args.strategy else None
+    try:
+        table = LockstepTable(args.lanes, strategy, rng=np.random.default_rng(args.seed), take_insurance=args.insurance)
+    except ValueError as error:
+        parser.error(str(error))
+    print(table.run(args.rounds, args.bet).summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Paired simulation of two table variants on common random numbers.
+
+Both variants play every round from the same shoe: before each round the
+variant's deck is set to the baseline's cards, cursor and RNG state, so
+they are dealt the same cards until their decisions make them draw
+differently. The next round starts from wherever the baseline's shoe got
+to. Luck of the deal is then shared, and the difference between the
+variants is estimated from per-round paired differences, whose variance is
+far smaller than that of two independent runs.
+
+The variant is the baseline with some table options replaced, given as
+``simulate.py`` options::
+
+    python paired.py --rounds 1000000 --seed 1 --variant=--double-after-split
+    python paired.py --rounds 1000000 --seed 1 --strategy mine.npz --variant="--strategy theirs.npz"
+    python paired.py --rounds 1000000 --seed 1 --strategy s.npz --variant="--double-after-split --strategy s_das.npz"
+"""
+import argparse
+import os
+import shlex
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+import numpy as np
+
+from checkpoint import ShoeState
+from simulate import (DEFAULT_TABLES, SimulationConfig, SimulationStats, WorkerTable, add_table_arguments,
+                      check_table_options, split_rounds, table_config)
+from streaming_stats import RunningMoments, z_score
+
+
+class PairedStats:
+    """Results of the baseline and the variant, plus their per-seat-round differences."""
+
+    def __init__(self, bankroll: int = 50, session_rounds: int = 100):
+        self.baseline = SimulationStats(bankroll, session_rounds)
+        self.variant = SimulationStats(bankroll, session_rounds)
+        self.difference = RunningMoments() # Of variant net - baseline net
+        self.elapsed = 0.0
+
+    def merge(self, other: "PairedStats"):
+        self.baseline.merge(other.baseline)
+        self.variant.merge(other.variant)
+        self.difference.merge(other.difference)
+
+    @property
+    def edge_difference(self) -> float:
+        """How much the variant lowers the house edge, as a fraction of the baseline's average bet."""
+        return (self.variant.net - self.baseline.net) / self.baseline.wagered if self.baseline.wagered else 0.0
+
+    @property
+    def standard_error(self) -> float:
+        if not self.baseline.wagered:
+            return 0.0
+        return self.difference.standard_error / (self.baseline.wagered / self.baseline.rounds)
+
+    def interval(self, level: float = 0.95) -> Tuple[float, float]:
+        half = z_score(level) * self.standard_error
+        return self.edge_difference - half, self.edge_difference + half
+
+    @property
+    def variance_reduction(self) -> float:
+        """Rounds two independent runs would need for the same precision, per paired round."""
+        paired = self.difference.variance
+        return (self.baseline.moments.variance + self.variant.moments.variance) / paired if paired else float("inf")
+
+    def summary(self) -> str:
+        low, high = self.interval()
+        return (f"{self.baseline.rounds:,} paired rounds in {self.elapsed:.2f}s\n"
+                f"Baseline house edge: {self.baseline.house_edge * 100:.3f}% ± {self.baseline.standard_error * 100:.3f}%\n"
+                f"Variant house edge:  {self.variant.house_edge * 100:.3f}% ± {self.variant.standard_error * 100:.3f}%\n"
+                f"Variant gains {self.edge_difference * 100:.3f}% ± {self.standard_error * 100:.3f}% of the bet "
+                f"(95% interval {low * 100:.3f}% to {high * 100:.3f}%)\n"
+                f"Independent runs would need {self.variance_reduction:.1f}x the rounds for this precision")
+
+
+def run_paired_worker(rounds: int, seed: np.random.SeedSequence, baseline: SimulationConfig,
+                      variant: SimulationConfig, tables: int = 1) -> PairedStats:
+    """Plays `rounds` rounds of each variant on one table's stream of shoes."""
+    index = seed.spawn_key[-1] if seed.spawn_key else 0
+    first = WorkerTable(baseline, np.random.default_rng(seed), index, tables)
+    second = WorkerTable(variant, np.random.default_rng(seed), index, tables)
+    stats = PairedStats(baseline.bankroll, baseline.session_rounds)
+    for _ in range(rounds):
+        first.game.return_discards() # So a continuous shuffler holds the same cards in both games
+        second.game.return_discards()
+        ShoeState.capture(first.game.deck).restore(second.game.deck)
+        first.play(stats.baseline)
+        second.play(stats.variant)
+        for mine, theirs in zip(first.game.player_balances, second.game.player_balances):
+            stats.difference.add(int(theirs) - int(mine)) # Both seats started the round on UNLIMITED_BALANCE
+    return stats
+
+
+def simulate_paired(rounds: int, baseline: SimulationConfig, variant: SimulationConfig,
+                    workers: Optional[int] = None, seed: Optional[int] = None,
+                    tables: Optional[int] = None) -> PairedStats:
+    """``simulate.simulate`` for a baseline and a variant playing the same shoes."""
+    workers = workers or os.cpu_count() or 1
+    tables = tables or DEFAULT_TABLES
+    shares = split_rounds(rounds, tables)
+    seeds = np.random.SeedSequence(seed).spawn(tables)
+
+    start = time.perf_counter()
+    total = PairedStats(baseline.bankroll, baseline.session_rounds)
+    if workers == 1:
+        for share, s in zip(shares, seeds):
+            if share:
+                total.merge(run_paired_worker(share, s, baseline, variant, tables))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_paired_worker, share, s, baseline, variant, tables)
+                       for share, s in zip(shares, seeds) if share]
+            for future in futures:
+                total.merge(future.result())
+    total.elapsed = time.perf_counter() - start
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two table variants on the same shoes.")
+    parser.add_argument("--rounds", type=int, default=100000, help="Paired rounds to play")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=None, help="Master seed for reproducible runs")
+    parser.add_argument("--tables", type=int, default=DEFAULT_TABLES,
+                        help="Independent RNG streams to split the rounds between (default: %(default)s)")
+    add_table_arguments(parser)
+    parser.add_argument("--variant", required=True, help='Table options that differ, e.g. --variant=--double-after-split')
+    args = parser.parse_args()
+
+    # Reparse the variant's options over a copy of the baseline's, so unchanged ones carry over
+    variant_args = parser.parse_args(shlex.split(args.variant) + [f"--variant={args.variant}"],
+                                     namespace=argparse.Namespace(**vars(args)))
+    for options in (args, variant_args):
+        check_table_options(parser, options)
+    stats = simulate_paired(args.rounds, table_config(args), table_config(variant_args),
+                            workers=args.workers, seed=args.seed, tables=args.tables)
+    print(stats.summary())
+
+
+if __name__ == "__main__":
+    main()
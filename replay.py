@@ -0,0 +1,197 @@
+"""Rebuilds ``BlackjackGame`` state from a hand-history log.
+
+A single pass over the log builds a ``HistoryIndex``: the byte offset and
+record number of every round start. Each round opens with a snapshot of
+every balance, so the state after any record is the round that contains it
+replayed from its start. The replay applies cards, actions and balances
+directly to ``Hand`` objects without running the rules engine, so a query
+costs one bisect plus a few dozen records, however long the log is.
+
+Player messages and the shoe order are not part of the log and are not
+restored.
+
+Usage:
+    python replay.py history.bin --record 5000000
+"""
+import argparse
+import time
+from bisect import bisect_right
+from typing import List, Optional
+
+import numpy as np
+
+from cards import Card
+from engine import BlackjackGame
+from hand import Hand
+import history
+
+
+class HistoryIndex:
+    """Offsets and record numbers of every ROUND record in a log."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        offsets: List[int] = []
+        first_records: List[int] = []
+        position = 0
+        count = 0
+        size = len(data)
+        round_type = history.ROUND
+        while position + 2 <= size:
+            end = position + 2 + (data[position] | data[position + 1] << 8) # As history.record_end, inlined
+            if end > size:
+                break # Torn tail from an interrupted write
+            if data[position + 2] == round_type:
+                offsets.append(position)
+                first_records.append(count)
+            position = end
+            count += 1
+        self.size = position # Bytes of complete records
+        self.records = count
+        self.offsets = np.array(offsets, dtype=np.int64)
+        self.first_records = np.array(first_records, dtype=np.int64)
+
+    @classmethod
+    def from_file(cls, path: str) -> "HistoryIndex":
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    @property
+    def rounds(self) -> int:
+        return len(self.offsets)
+
+    def replay(self, record: Optional[int] = None) -> BlackjackGame:
+        """Game state after the first `record` records (the whole log by default)."""
+        if record is None or record > self.records:
+            record = self.records
+        round_idx = bisect_right(self.first_records, record - 1) - 1
+        if round_idx < 0:
+            return BlackjackGame()
+        start = int(self.offsets[round_idx])
+        return replay_round(self.data, start, record - int(self.first_records[round_idx]))
+
+
+def _apply_card(hand: Hand, card: Card):
+    hand.append(card)
+    if hand.busted:
+        hand.stood = True
+    elif hand.from_split and len(hand) == 2 and (hand.cards[0].is_ace or hand.blackjack):
+        hand.stood = True # Split Aces take one card; a split 21 stands
+
+
+def replay_round(data: bytes, offset: int, num_records: int) -> BlackjackGame:
+    """Applies `num_records` records of the round starting at `offset` to a fresh game."""
+    view = memoryview(data)
+    game: Optional[BlackjackGame] = None
+    dealer = history.DEALER_SEAT
+    position = offset
+    for _ in range(num_records):
+        end = history.record_end(data, position)
+        kind = data[position + 2]
+        payload = view[position + 3:end]
+        position = end
+
+        if kind == history.CARD:
+            seat, hand_idx, card_id = history.decode(kind, payload)
+            card = Card.from_id(card_id)
+            if seat == dealer:
+                game.dealer_hand.append(card)
+            else:
+                _apply_card(game.player_hands[seat][hand_idx], card)
+        elif kind == history.ACTION:
+            seat, hand_idx, action = history.decode(kind, payload)
+            hand = game.player_hands[seat][hand_idx]
+            if action == history.STAND:
+                hand.stood = True
+            elif action == history.DOUBLE:
+                hand.bet *= 2
+                hand.doubled = True
+                hand.stood = True
+            elif action == history.SPLIT:
+                game.player_split_flags[seat] = True
+                game.player_hands[seat][hand_idx] = Hand([hand.cards[0]], bet=hand.bet, from_split=True)
+                game.player_hands[seat].append(Hand([hand.cards[1]], bet=hand.bet, from_split=True))
+            elif action == history.INSURE:
+                game.player_insurance_bets[seat] = hand.bet // 2
+                game.player_made_insurance_decision[seat] = True
+            elif action == history.DECLINE:
+                game.player_made_insurance_decision[seat] = True
+        elif kind == history.SETTLE:
+            seat, balance = history.decode(kind, payload)
+            if seat == dealer:
+                game.dealer_balance = balance
+            else:
+                game.player_balances[seat] = balance
+        elif kind == history.ROUND:
+            seats, *bets = history.decode(kind, payload)
+            game = BlackjackGame(num_players=seats)
+            game.player_hands = [[Hand(bet=bet)] for bet in bets]
+            game.game_over = False
+        elif kind == history.END:
+            game.game_over = True
+
+    if game is not None:
+        _derive_turn_state(game)
+    return game
+
+
+def _derive_turn_state(game: BlackjackGame):
+    """Recomputes the flags the engine sets while moving between turns."""
+    dealer = game.dealer_hand
+    if len(dealer) < 2:
+        return # Still dealing
+    seats = range(game.num_players)
+    upcard_ace = dealer[0].is_ace
+    undecided = [i for i in seats if not game.player_made_insurance_decision[i]]
+    if upcard_ace and undecided and not game.game_over:
+        game.insurance_offered = True
+        game.current_player_index = undecided[0]
+        return
+
+    # Insurance resolved or never offered: naturals and a dealer Blackjack have ended those hands
+    for i in seats:
+        first = game.player_hands[i][0]
+        if (first.blackjack and not first.from_split) or (upcard_ace and dealer.blackjack):
+            first.stood = True
+
+    for i in seats:
+        hands = game.player_hands[i]
+        unfinished = [h for h, hand in enumerate(hands) if not hand.finished]
+        if unfinished:
+            game.current_player_index = i
+            game.current_hand_indices[i] = unfinished[0]
+            return
+        game.current_hand_indices[i] = len(hands) - 1
+    game.current_player_index = game.num_players - 1
+    game.dealer_turn_active = not game.game_over
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild game state from a hand-history log.")
+    parser.add_argument("log", help="Hand-history file written by history.HandHistoryWriter")
+    parser.add_argument("--record", type=int, default=None, help="Replay up to this record (default: the whole log)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = HistoryIndex.from_file(args.log)
+    indexed = time.perf_counter() - start
+    print(f"Indexed {index.records:,} records / {index.rounds:,} rounds in {indexed:.3f}s "
+          f"({index.records / max(indexed, 1e-9):,.0f} records/s)")
+
+    start = time.perf_counter()
+    game = index.replay(args.record)
+    print(f"Rebuilt state in {(time.perf_counter() - start) * 1000:.3f} ms")
+
+    print(f"Dealer: {' '.join(map(str, game.dealer_hand))} ({game.dealer_hand.value.display}), "
+          f"balance £{game.dealer_balance}")
+    for i in range(game.num_players):
+        hands = ", ".join(f"[{' '.join(map(str, hand))}] {hand.value.display} £{hand.bet}" for hand in game.player_hands[i])
+        print(f"Player {i + 1}: balance £{game.player_balances[i]}: {hands}")
+    phase = ("round over" if game.game_over else "insurance" if game.insurance_offered
+             else "dealer's turn" if game.dealer_turn_active
+             else f"player {game.current_player_index + 1} to act")
+    print(f"Phase: {phase}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""Array-backed multi-deck shoe.
+
+The shoe is a single NumPy ``uint8`` array of card ids (see ``cards``) and a
+read cursor. Shuffling permutes the array in place and dealing advances the
+cursor; ``deal()`` hands out one of the interned ``Card`` flyweights.
+
+A deck given a shoe source (a ``ShoePool``, or a ``shoe_file.ShoeReader``)
+takes ready-shuffled shoes from it instead, so a reshuffle is only a swap
+of the array.
+
+Shoe models: a deck with a `penetration` has a cut card, and the game
+reshuffles before the first deal after it comes out. A
+``ContinuousShuffler`` never reshuffles: every round's cards go back into
+the machine, and each card is drawn at random from per-rank counts of the
+cards inside it.
+
+Every deck also answers composition queries about its undealt cards (per
+rank, ten density, the chance of each rank coming next) in O(1). A shoe
+does it as ``CardCounter`` keeps its count: per-rank prefix sums over the
+card order, built once per shuffle, so dealing does no bookkeeping at all.
+"""
+
+import queue
+import threading
+import time
+from typing import List, Optional, Protocol, Sequence
+
+import numpy as np
+
+from cards import CARDS, CARDS_PER_DECK, SUITS, VALUES, Card
+from counting import CardCounter
+from dealer_odds import NUM_RANKS, RANK_INDEX, Composition
+from events import EventHandler, GameEvent
+
+
+class ShoePool:
+    """Shoes shuffled ahead of time by a background thread.
+
+    The thread keeps up to `size` shoes ready, shuffling at most `refill_rate`
+    shoes per second (as fast as it can when None). Each shoe is a shuffle of
+    the one before, exactly as a deck reshuffling its own array with the same
+    generator would produce, so a pool does not change which shoes are dealt.
+    The pool owns `rng` from then on. While the pool is full the thread sleeps.
+
+    Several decks (or threads) may take from one pool. A shoe that is not
+    ready within `timeout` seconds, or any shoe once the thread has stopped,
+    is shuffled inline from a generator spawned off `rng` instead, so a
+    caller never waits on a thread that has died.
+    """
+
+    def __init__(self, rng: Optional[np.random.Generator] = None, num_decks: int = 6, size: int = 4,
+                 refill_rate: Optional[float] = None, timeout: float = 1.0):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.num_decks = num_decks
+        self.size = size
+        self.refill_rate = refill_rate
+        self.timeout = timeout
+        self.hits = 0 # Shoes that were ready when asked for
+        self.misses = 0 # Shoes the caller had to wait for
+        self.fallbacks = 0 # Shoes shuffled inline because the thread did not deliver
+        self.wait_seconds = 0.0 # Total time spent waiting on misses
+        self._fallback_rng = self.rng.spawn(1)[0] # Never touched by the thread
+        self._take_lock = threading.Lock()
+        self._ready: "queue.Queue[np.ndarray]" = queue.Queue(maxsize=size)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._fill_loop, name="shoe-pool", daemon=True)
+        self._thread.start()
+
+    def _fill_loop(self):
+        shoe = np.tile(np.arange(CARDS_PER_DECK, dtype=np.uint8), self.num_decks)
+        while not self._stop.is_set():
+            shoe = shoe.copy()
+            self.rng.shuffle(shoe)
+            self._ready.put(shoe) # Blocks until a shoe is taken; close() takes one to wake it
+            if self.refill_rate:
+                self._stop.wait(1 / self.refill_rate)
+
+    def take(self) -> np.ndarray:
+        """The next shuffled shoe, waiting up to `timeout` for the thread if none is ready."""
+        with self._take_lock:
+            try:
+                shoe = self._ready.get_nowait()
+                self.hits += 1
+                return shoe
+            except queue.Empty:
+                pass
+            if self._thread.is_alive():
+                self.misses += 1
+                start = time.perf_counter()
+                try:
+                    shoe = self._ready.get(timeout=self.timeout)
+                    return shoe
+                except queue.Empty:
+                    pass
+                finally:
+                    self.wait_seconds += time.perf_counter() - start
+            self.fallbacks += 1
+            shoe = np.tile(np.arange(CARDS_PER_DECK, dtype=np.uint8), self.num_decks)
+            self._fallback_rng.shuffle(shoe)
+            return shoe
+
+    @property
+    def hit_rate(self) -> float:
+        taken = self.hits + self.misses
+        return self.hits / taken if taken else 0.0
+
+    def close(self):
+        """Stops the background thread."""
+        self._stop.set()
+        try:
+            self._ready.get_nowait() # Frees a slot, in case the thread is blocked putting a shoe
+        except queue.Empty:
+            pass
+        self._thread.join()
+
+
+class ShoeSource(Protocol):
+    """Hands a deck its shuffled shoes; the deck deals from each array without copying it."""
+    num_decks: int
+
+    def take(self) -> np.ndarray: ...
+
+
+TEN = NUM_RANKS - 1 # Rank index of the ten-value cards
+# Card ids of each rank index (Ace = 0, 2-9 = 1-8, ten-value = 9), and the rank index of each card id
+RANK_IDS = [[card.id for card in CARDS if card.hard - 1 == rank] for rank in range(NUM_RANKS)]
+RANK_OF_ID = [card.hard - 1 for card in CARDS]
+_RANK_ONE_HOT = np.eye(NUM_RANKS, dtype=np.int16)[RANK_INDEX] # Row per card id
+
+
+# Deck class to manage the cards
+class Deck:
+    returns_discards = False # Discards stay out of play until the next shuffle
+
+    def __init__(self, rng: Optional[np.random.Generator] = None, source: Optional[ShoeSource] = None,
+                 penetration: Optional[float] = None):
+        self.rng = rng if rng is not None else np.random.default_rng() # Shuffle source
+        self.source = source # Ready-shuffled shoes; the deck shuffles with rng when unset
+        self.suits = SUITS
+        self.values = VALUES
+        self.num_decks = source.num_decks if source is not None else 6 # Define the number of decks
+        # Every card of every deck, as ids; the order is what gets shuffled
+        self.cards = np.tile(np.arange(CARDS_PER_DECK, dtype=np.uint8), self.num_decks)
+        self.position = 0 # Index of the next card to deal
+        # Cards dealt before the cut card comes out; without one the shoe is dealt down to the last round
+        self.cut_card: Optional[int] = round(penetration * self.cards.size) if penetration is not None else None
+        self._rank_prefix: Optional[np.ndarray] = None # Built on the first composition query after a shuffle
+        self._prefix_cards: Optional[np.ndarray] = None # The card order it was built for
+        self.on_event: Optional[EventHandler] = None # Observer hook, set by the owning game
+        self.counters: List[CardCounter] = [] # Told about every new card order
+        self.reset_deck()
+
+    def emit(self, kind: str, message: str, icon: str = "", pause: float = 0.0):
+        if self.on_event is not None:
+            self.on_event(GameEvent(kind, message, icon, pause))
+
+    def __len__(self) -> int:
+        """Cards left to deal."""
+        return self.cards.size - self.position
+        
+    @property
+    def cut_card_reached(self) -> bool:
+        """Whether the shoe should be shuffled before the next round."""
+        return self.cut_card is not None and self.position >= self.cut_card
+
+    def discard(self, card_ids: Sequence[int]):
+        """Takes back a finished round's cards; a shoe leaves them in the discard tray."""
+
+    @property
+    def reshuffle_pause(self) -> float:
+        """Seconds a UI may hold the reshuffle notice; none when a ready shoe is just swapped in."""
+        return 0.0 if self.source is not None else 1.0
+
+    def reset_deck(self):
+        # All cards are always in the array; gathering them back is just a rewind
+        self.position = 0
+        self.shuffle()
+        
+    def shuffle(self):
+        if self.source is not None:
+            self.cards = self.source.take()
+        else:
+            self.rng.shuffle(self.cards)
+        self._rank_prefix = None
+        for counter in self.counters:
+            counter.on_shuffle(self)
+
+    def add_counter(self, counter: CardCounter):
+        """Attaches a card counter; it tracks every card dealt from here on without slowing deal()."""
+        self.counters.append(counter)
+        counter.on_shuffle(self)
+
+    # --- Composition of the undealt cards ---
+
+    def _prefix(self) -> np.ndarray:
+        """prefix[n, rank] = cards of that rank among the first n of the shoe."""
+        if self._rank_prefix is None or self._prefix_cards is not self.cards:
+            self._rank_prefix = np.zeros((self.cards.size + 1, NUM_RANKS), dtype=np.int16)
+            np.cumsum(_RANK_ONE_HOT[self.cards], axis=0, out=self._rank_prefix[1:])
+            self._prefix_cards = self.cards
+        return self._rank_prefix
+
+    def composition(self) -> Composition:
+        """Undealt cards per rank index (Ace = 0, 2-9 = 1-8, ten-value = 9), as ``dealer_odds`` takes them."""
+        prefix = self._prefix()
+        return tuple((prefix[-1] - prefix[self.position]).tolist())
+
+    def remaining(self, rank: int) -> int:
+        """Undealt cards of one rank index."""
+        prefix = self._prefix()
+        return prefix.item(self.cards.size, rank) - prefix.item(self.position, rank)
+
+    def ten_density(self) -> float:
+        """Fraction of the undealt cards worth ten."""
+        left = len(self)
+        return self.remaining(TEN) / left if left else 0.0
+
+    def next_card_probability(self, rank: int) -> float:
+        """Chance that the next card dealt has this rank index."""
+        left = len(self)
+        return self.remaining(rank) / left if left else 0.0
+
+    def deal_id(self) -> int:
+        """Deals the next card as its integer id."""
+        if self.position >= self.cards.size:
+            self.emit("warning", "Reshuffling the shoe...", pause=self.reshuffle_pause) # Inform user about reshuffle
+            self.reset_deck()
+        card_id = self.cards.item(self.position)
+        self.position += 1
+        return card_id
+
+    def deal_ids(self, count: int) -> np.ndarray:
+        """Deals `count` cards at once as a read-only view of the shoe.
+
+        The view is valid until the next reshuffle; copy it to keep it longer.
+        """
+        if len(self) < count:
+            self.emit("warning", "Reshuffling the shoe...", pause=self.reshuffle_pause)
+            self.reset_deck()
+        ids = self.cards[self.position:self.position + count]
+        self.position += count
+        ids.flags.writeable = False
+        return ids
+        
+    def deal(self) -> Card:
+        return Card.from_id(self.deal_id())
+
+
+
+
+class ContinuousShuffler(Deck):
+    """A continuous shuffling machine.
+
+    The machine keeps counts of the cards inside it per rank and per card id.
+    A draw picks a rank with probability proportional to its count, then a
+    card of that rank the same way: a walk over at most ten ranks and sixteen
+    ids, whatever the size of the shoe. ``discard`` puts cards back, so there
+    is never a reshuffle. Uniforms come from the generator a block at a time.
+    A round that takes every card out of the machine cannot go on: dealing
+    from an empty machine raises RuntimeError.
+    """
+    returns_discards = True
+    BLOCK = 1024 # Uniform draws taken from the generator at once
+
+    def __init__(self, rng: Optional[np.random.Generator] = None):
+        self.id_counts: List[int] = []
+        self.rank_counts: List[int] = []
+        self.cards_left = 0
+        self._uniforms: List[float] = []
+        self._next_uniform = 0
+        super().__init__(rng)
+
+    def __len__(self) -> int:
+        return self.cards_left
+
+    def reset_deck(self):
+        """Puts every card back into the machine."""
+        self.position = 0 # Cards dealt since then
+        self.id_counts = [self.num_decks] * CARDS_PER_DECK
+        self.rank_counts = [self.num_decks * len(ids) for ids in RANK_IDS]
+        self.cards_left = self.num_decks * CARDS_PER_DECK
+
+    def add_counter(self, counter: CardCounter):
+        raise ValueError("A continuous shuffler has no shoe to count down")
+
+    def composition(self) -> Composition:
+        return tuple(self.rank_counts)
+
+    def remaining(self, rank: int) -> int:
+        return self.rank_counts[rank]
+
+    def discard(self, card_ids: Sequence[int]):
+        id_counts, rank_counts = self.id_counts, self.rank_counts
+        for card_id in card_ids:
+            id_counts[card_id] += 1
+            rank_counts[RANK_OF_ID[card_id]] += 1
+        self.cards_left += len(card_ids)
+
+    def deal_id(self) -> int:
+        if not self.cards_left: # Every card is out on the table; none may be dealt twice
+            raise RuntimeError(f"The continuous shuffler is empty: all {self.num_decks * CARDS_PER_DECK} cards "
+                               f"are on the table this round")
+        if self._next_uniform >= len(self._uniforms):
+            self._uniforms = self.rng.random(self.BLOCK).tolist()
+            self._next_uniform = 0
+        target = int(self._uniforms[self._next_uniform] * self.cards_left)
+        self._next_uniform += 1
+        rank_counts = self.rank_counts
+        rank = 0
+        while target >= rank_counts[rank]:
+            target -= rank_counts[rank]
+            rank += 1
+        id_counts = self.id_counts
+        for card_id in RANK_IDS[rank]:
+            if target < id_counts[card_id]:
+                break
+            target -= id_counts[card_id]
+        id_counts[card_id] -= 1
+        rank_counts[rank] -= 1
+        self.cards_left -= 1
+        self.position += 1
+        return card_id
+
+    def deal_ids(self, count: int) -> np.ndarray:
+        return np.array([self.deal_id() for _ in range(count)], dtype=np.uint8)
+
+    def machine_state(self) -> tuple:
+        """Everything later draws depend on besides the generator, for checkpoints."""
+        return list(self.id_counts), list(self.rank_counts), self.cards_left, list(self._uniforms), self._next_uniform
+
+    def restore_machine(self, state: tuple):
+        id_counts, rank_counts, self.cards_left, uniforms, self._next_uniform = state
+        self.id_counts, self.rank_counts, self._uniforms = list(id_counts), list(rank_counts), list(uniforms)
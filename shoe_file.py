@@ -0,0 +1,139 @@
+"""Pre-generated shoe files.
+
+A shoe file is a 16-byte header followed by shuffled shoes, each one the
+card ids (see ``cards``) of a full ``Deck`` in dealing order::
+
+    [magic: 4s "SHOE"][version: u8][decks: u8][cards per shoe: u16][shoes: u64]
+    [shoe 0: uint8 x cards per shoe][shoe 1] ...
+
+``ShoeFile`` memory-maps a file and ``ShoeReader`` hands its shoes to a
+``Deck`` as read-only views of the map, so dealing copies nothing and every
+process reading the file shares the same page-cached bytes. Each chunk of
+CHUNK_SHOES shoes is shuffled by its own child of the seed's
+``SeedSequence``, so a file is the same whatever the number of processes
+that wrote it::
+
+    python shoe_file.py shoes.bin --shoes 10000000 --seed 1 --workers 8
+    python simulate.py --rounds 1000000 --shoe-file shoes.bin
+"""
+import argparse
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from cards import CARDS_PER_DECK
+
+MAGIC = b"SHOE"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHQ")
+NUM_DECKS = 6 # As Deck.num_decks
+CHUNK_SHOES = 1 << 15 # Shoes shuffled together by the writer, each chunk from its own seed
+
+
+class ShoeHeader(NamedTuple):
+    num_decks: int
+    cards_per_shoe: int
+    shoes: int
+
+
+def write_chunk(path: str, entropy: int, first: int, count: int, num_decks: int):
+    """Shuffles shoes `first`..`first + count - 1` (one chunk) into their place in the file."""
+    rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(first // CHUNK_SHOES,)))
+    ordered = np.tile(np.arange(CARDS_PER_DECK, dtype=np.uint8), (count, num_decks))
+    shoes = rng.permuted(ordered, axis=1)
+    with open(path, "r+b") as f:
+        f.seek(HEADER.size + first * shoes.shape[1])
+        f.write(shoes.data)
+
+
+def write_shoes(path: str, shoes: int, seed: Optional[int] = None, num_decks: int = NUM_DECKS,
+                workers: Optional[int] = None) -> int:
+    """Writes a file of `shoes` shuffled shoes, spreading the shuffling over `workers` processes.
+    Returns the seed's entropy, which rebuilds the same file when given as `seed`."""
+    entropy = np.random.SeedSequence(seed).entropy
+    cards_per_shoe = num_decks * CARDS_PER_DECK
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, num_decks, cards_per_shoe, shoes))
+        f.truncate(HEADER.size + shoes * cards_per_shoe)
+    chunks = [(first, min(CHUNK_SHOES, shoes - first)) for first in range(0, shoes, CHUNK_SHOES)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for first, count in chunks:
+            write_chunk(path, entropy, first, count, num_decks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for future in [pool.submit(write_chunk, path, entropy, first, count, num_decks)
+                           for first, count in chunks]:
+                future.result()
+    return entropy
+
+
+class ShoeFile:
+    """A memory-mapped shoe file; ``shoe(k)`` is a read-only view, not a copy."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, num_decks, cards_per_shoe, shoes = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} shoe file")
+        self.header = ShoeHeader(num_decks, cards_per_shoe, shoes)
+        self.num_decks = num_decks
+        self.shoes = np.memmap(path, dtype=np.uint8, mode="r", offset=HEADER.size, shape=(shoes, cards_per_shoe))
+
+    def __len__(self) -> int:
+        return self.header.shoes
+
+    def shoe(self, index: int) -> np.ndarray:
+        return self.shoes[index]
+
+    def reader(self, start: int = 0, step: int = 1) -> "ShoeReader":
+        return ShoeReader(self, start, step)
+
+
+class ShoeReader:
+    """Deals shoes ``start, start + step, ...`` of a file to a ``Deck`` (as its shoe source),
+    starting over from `start` when it runs off the end. Workers of one run read
+    interleaved shoes by using their index as `start` and the worker count as `step`."""
+
+    def __init__(self, shoe_file: ShoeFile, start: int = 0, step: int = 1):
+        if not 0 <= start < len(shoe_file):
+            raise ValueError(f"{shoe_file.path} has no shoe {start}")
+        self.file = shoe_file
+        self.num_decks = shoe_file.num_decks
+        self.start = start
+        self.step = step
+        self.next_shoe = start # Index of the shoe the next take() returns
+        self.passes = 0 # Times the reader has started over
+
+    def take(self) -> np.ndarray:
+        if self.next_shoe >= len(self.file):
+            self.next_shoe = self.start
+            self.passes += 1
+        shoe = self.file.shoe(self.next_shoe)
+        self.next_shoe += self.step
+        return shoe
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a file of pre-shuffled shoes.")
+    parser.add_argument("path", help="Shoe file to create")
+    parser.add_argument("--shoes", type=int, required=True, help="Shoes to write")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for a reproducible file")
+    parser.add_argument("--decks", type=int, default=NUM_DECKS, help="Decks per shoe")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    entropy = write_shoes(args.path, args.shoes, args.seed, args.decks, args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {args.shoes:,} shoes to {args.path} in {elapsed:.2f}s "
+          f"({args.shoes / max(elapsed, 1e-9):,.0f} shoes/s), seed {entropy}")
+
+
+if __name__ == "__main__":
+    main()
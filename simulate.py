@@ -0,0 +1,546 @@
+"""Monte Carlo simulator for the rules in ``engine.BlackjackGame``.
+
+Rounds are played through the real game object, so every rule and payout
+(6-deck shoe, dealer hits soft 17, no double after split, one split, 3:2
+blackjack, insurance against an Ace) is exactly what the app enforces.
+Work is split into tables, each with its own child of the seed's
+``SeedSequence`` and so its own PCG64 stream. A process pool plays the
+tables and their statistics are merged in table order, so a run is
+reproducible bit for bit from its seed and table count alone.
+
+Usage:
+    python simulate.py --rounds 1000000 --workers 8 --seed 42
+    python simulate.py --rounds 1000000 --workers 3 --tables 24 --seed 42  # same as with --workers 8 --tables 24
+    python simulate.py --rounds 1000000 --count hilo --ramp "1:20,2:40,3:80,4:100"
+    python simulate.py --rounds 100000 --tables 2 --history hands.bin  # hands.bin.0, hands.bin.1
+    python simulate.py --rounds 10000 --players 500 --compact
+    python simulate.py --rounds 1000000 --count hilo --export rounds.parquet  # rounds.0.parquet, ...
+    python simulate.py --rounds 100000000 --seed 7 --checkpoint run.ckpt  # add --resume after a crash
+    python simulate.py --rounds 1000000 --shoe-file shoes.bin  # shoes written by shoe_file.py
+
+``play_rounds`` is the in-process batch API: it plays rounds with any policy
+and returns per-round results as arrays instead of summary statistics.
+"""
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+import checkpoint
+from cards import Card
+from counting import SYSTEMS, BetRamp, CardCounter
+from engine import BlackjackGame
+from export import RoundExporter, worker_path
+from hand import Hand
+from history import MAX_BET, HandHistoryWriter
+from shoe_file import ShoeFile
+from strategy import DOUBLE, HIT, SPLIT, STAND, basic_strategy
+from strategy_table import ACTION_CODES, ACTIONS, StrategyTable
+from streaming_stats import BankrollTracker, OutcomeHistogram, RunningMoments, z_score
+
+# Chooses an action for (hand, dealer upcard, can_double, can_split)
+Policy = Callable[[Hand, Card, bool, bool], str]
+# The same decision as an index into strategy_table.ACTIONS
+ActionChooser = Callable[[Hand, Card, bool, bool], int]
+
+# Columns of the per-seat action counts: the strategy table's action codes, then insurance taken
+ACTION_COLUMNS = ACTIONS + ("insurance",)
+INSURED = len(ACTIONS)
+MOVES = {STAND: "stand", HIT: "hit", DOUBLE: "double_down", SPLIT: "split"} # Game method for each action
+
+# Seats never run dry in the simulator; net results are measured as balance deltas
+UNLIMITED_BALANCE = 10 ** 12
+# Tables a run is split into unless told otherwise; fixed, so a seed gives the same results on any machine
+DEFAULT_TABLES = 16
+
+
+class SimulationStats:
+    """Per-seat round results, mergeable across workers.
+
+    Everything is accumulated as it streams in, so memory stays flat however
+    many rounds are recorded and every estimate can be read at any time.
+    """
+
+    def __init__(self, bankroll: int = 50, session_rounds: int = 100):
+        self.rounds = 0 # Seat-rounds played
+        self.hands = 0 # Player hands settled (a split adds one)
+        self.wagered = 0 # Initial bets placed
+        self.net = 0 # Player net result
+        self.moments = RunningMoments() # Of the net result per seat-round
+        self.outcomes = OutcomeHistogram() # Net result per seat-round, in bets
+        self.bankrolls = BankrollTracker(bankroll, session_rounds) # Drawdown and risk of ruin per seat
+        self.wins = 0
+        self.losses = 0
+        self.pushes = 0
+        self.doubles = 0
+        self.splits = 0
+        self.insurance_taken = 0
+        self.elapsed = 0.0 # Wall-clock seconds, set by simulate()
+
+    def record(self, net: int, bet: int, hands: int, seat: int = 0):
+        self.rounds += 1
+        self.hands += hands
+        self.wagered += bet
+        self.net += net
+        self.moments.add(net)
+        self.outcomes.add(net, bet)
+        self.bankrolls.add(seat, net, bet)
+        if net > 0:
+            self.wins += 1
+        elif net < 0:
+            self.losses += 1
+        else:
+            self.pushes += 1
+
+    def record_batch(self, net: np.ndarray, bets: np.ndarray, hands: np.ndarray):
+        """``record`` for one round of many seats (or lockstep lanes) at once, given as parallel arrays."""
+        self.rounds += net.size
+        self.hands += int(hands.sum())
+        self.wagered += int(bets.sum())
+        self.net += int(net.sum())
+        self.moments.add_batch(net)
+        self.outcomes.add_batch(net, bets)
+        self.bankrolls.add_batch(net, bets)
+        self.wins += int(np.count_nonzero(net > 0))
+        self.losses += int(np.count_nonzero(net < 0))
+        self.pushes += int(np.count_nonzero(net == 0))
+
+    def merge(self, other: "SimulationStats"):
+        for name, value in vars(other).items():
+            if name == "elapsed":
+                continue
+            mine = getattr(self, name)
+            if hasattr(mine, "merge"):
+                mine.merge(value)
+            else:
+                setattr(self, name, mine + value)
+
+    @property
+    def house_edge(self) -> float:
+        """Casino advantage as a fraction of the initial bet."""
+        return -self.net / self.wagered if self.wagered else 0.0
+
+    @property
+    def standard_error(self) -> float:
+        """Standard error of the house edge estimate."""
+        if self.rounds < 2 or not self.wagered:
+            return 0.0
+        average_bet = self.wagered / self.rounds
+        return self.moments.standard_error / average_bet
+
+    def house_edge_interval(self, level: float = 0.95) -> Tuple[float, float]:
+        half = z_score(level) * self.standard_error
+        return self.house_edge - half, self.house_edge + half
+
+    @property
+    def hands_per_second(self) -> float:
+        return self.hands / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        low, high = self.house_edge_interval()
+        bankrolls = self.bankrolls
+        return (f"{self.rounds:,} rounds, {self.hands:,} hands in {self.elapsed:.2f}s "
+                f"({self.hands_per_second:,.0f} hands/s), average bet {self.wagered / max(self.rounds, 1):.2f}\n"
+                f"House edge: {self.house_edge * 100:.3f}% ± {self.standard_error * 100:.3f}%\n"
+                f"Wins {self.wins:,}  Losses {self.losses:,}  Pushes {self.pushes:,}  "
+                f"Doubles {self.doubles:,}  Splits {self.splits:,}  Insurance {self.insurance_taken:,}\n"
+                f"95% interval {low * 100:.3f}% to {high * 100:.3f}%  Max drawdown £{bankrolls.max_drawdown:,}  "
+                f"Risk of ruin from £{bankrolls.bankroll} within {bankrolls.session_rounds} rounds: "
+                f"{bankrolls.risk_of_ruin * 100:.2f}% ({bankrolls.sessions:,} sessions)")
+
+
+def can_double(game: BlackjackGame, player_idx: int, hand_idx: int) -> bool:
+    """Mirrors the checks in BlackjackGame.double_down."""
+    hand = game.player_hands[player_idx][hand_idx]
+    return (len(hand) == 2 and
+            game.player_balances[player_idx] >= hand.bet and
+            (game.double_after_split or not game.player_split_flags[player_idx]))
+
+
+def can_split(game: BlackjackGame, player_idx: int, hand_idx: int) -> bool:
+    """Mirrors the checks in BlackjackGame.split."""
+    hand = game.player_hands[player_idx][hand_idx]
+    return (hand_idx == 0 and
+            not game.player_split_flags[player_idx] and
+            len(hand) == 2 and
+            hand[0].get_value() == hand[1].get_value() and
+            game.player_balances[player_idx] >= hand.bet)
+
+
+def always_insure(hand: Hand) -> bool:
+    return True
+
+
+def action_chooser(policy: Union[Policy, StrategyTable]) -> ActionChooser:
+    """The action-code form of a policy; a strategy table answers in codes directly."""
+    if isinstance(policy, StrategyTable):
+        return policy.decide_code
+    return lambda hand, upcard, can_double, can_split: ACTION_CODES[policy(hand, upcard, can_double, can_split)]
+
+
+def play_table_round(game: BlackjackGame, bets: Sequence[int], choose: ActionChooser,
+                     insure: Optional[Callable[[Hand], bool]], counts: List[int]):
+    """Plays one full round, adding each seat's actions to ``counts[seat * len(ACTION_COLUMNS) + column]``.
+    Results are left in the game: each seat's net is its balance minus UNLIMITED_BALANCE."""
+    width = len(ACTION_COLUMNS)
+    for i, bet in enumerate(bets):
+        game.player_hands[i][0].bet = bet
+        game.player_balances[i] = UNLIMITED_BALANCE
+    game.dealer_balance = UNLIMITED_BALANCE
+
+    game.deal_initial_cards()
+    while game.insurance_offered:
+        player_idx = game.current_player_index
+        if insure is not None and insure(game.player_hands[player_idx][0]):
+            counts[player_idx * width + INSURED] += 1
+            game.take_insurance()
+        else:
+            game.decline_insurance()
+
+    moves = [getattr(game, MOVES[action]) for action in ACTIONS]
+    upcard = game.dealer_hand[0]
+    while not game.game_over and not game.dealer_turn_active:
+        player_idx = game.current_player_index
+        hand_idx = game.current_hand_indices[player_idx]
+        hand = game.player_hands[player_idx][hand_idx]
+        code = choose(hand, upcard,
+                      can_double(game, player_idx, hand_idx),
+                      can_split(game, player_idx, hand_idx))
+        counts[player_idx * width + code] += 1
+        moves[code]()
+
+    if game.dealer_turn_active and not game.game_over:
+        game.dealer_play()
+        game.evaluate_winner()
+
+
+def play_round(game: BlackjackGame, bets: List[int], stats: SimulationStats,
+               policy: Union[Policy, StrategyTable] = basic_strategy,
+               insure: Optional[Callable[[Hand], bool]] = None) -> List[int]:
+    """Plays one full round with `policy` and records every seat's result.
+    `insure` decides insurance from the seat's first hand; by default it is always declined.
+    Returns the action counts of every seat, as filled in by play_table_round."""
+    width = len(ACTION_COLUMNS)
+    counts = [0] * (len(bets) * width)
+    play_table_round(game, bets, action_chooser(policy), insure, counts)
+    stats.doubles += sum(counts[ACTION_CODES[DOUBLE]::width])
+    stats.splits += sum(counts[ACTION_CODES[SPLIT]::width])
+    stats.insurance_taken += sum(counts[INSURED::width])
+    for i, bet in enumerate(bets):
+        stats.record(int(game.player_balances[i]) - UNLIMITED_BALANCE, bet, len(game.player_hands[i]), i)
+    return counts
+
+
+def export_round(exporter: RoundExporter, round_number: int, game: BlackjackGame, bets: Sequence[int],
+                 counts: List[int], true_count: float = math.nan):
+    """Adds a row per seat for the round just played (see export.COLUMNS)."""
+    width = len(ACTION_COLUMNS)
+    hit, double, split = ACTION_CODES[HIT], ACTION_CODES[DOUBLE], ACTION_CODES[SPLIT]
+    dealer_total = game.dealer_hand.value.total
+    upcard = game.dealer_hand[0].hard - 1
+    add = exporter.add
+    for seat, (bet, hands, balance) in enumerate(zip(bets, game.player_hands, game.player_balances)):
+        first = hands[0]
+        second_card = hands[1][0] if len(hands) > 1 else first[1] # A split keeps one card of the pair per hand
+        base = seat * width
+        add((round_number, seat, bet, len(hands), first[0].hard - 1, second_card.hard - 1, upcard,
+             counts[base + hit], counts[base + double] > 0, counts[base + split] > 0, counts[base + INSURED] > 0,
+             dealer_total, int(balance) - UNLIMITED_BALANCE, true_count))
+
+
+class RoundBatch(NamedTuple):
+    """Results of ``play_rounds``, indexed [round, seat]."""
+    net: np.ndarray # Net result of the seat's round
+    hands: np.ndarray # Hands played (2 after a split)
+    actions: np.ndarray # [round, seat, column] action counts, columns as ACTION_COLUMNS
+
+
+def play_rounds(policy: Union[Policy, StrategyTable], rounds: int, game: Optional[BlackjackGame] = None,
+                bets: Union[int, Sequence[int]] = 10, insure: Optional[Callable[[Hand], bool]] = None) -> RoundBatch:
+    """Plays `rounds` complete rounds through `game` (a new one-seat game by default) with no UI.
+
+    `policy` is a Policy callable or a StrategyTable; a table is queried by
+    action code, with no per-decision string handling, and also decides
+    insurance unless `insure` is given. `bets` is one amount for every seat or
+    one per seat.
+    """
+    game = game if game is not None else BlackjackGame()
+    seats = game.num_players
+    seat_bets = [bets] * seats if isinstance(bets, int) else list(bets)
+    choose = action_chooser(policy)
+    if insure is None and isinstance(policy, StrategyTable):
+        insure = policy.take_insurance
+    width = len(ACTION_COLUMNS)
+    net: List[int] = []
+    hands: List[int] = []
+    counts = [0] * (rounds * seats * width)
+    for r in range(rounds):
+        round_counts = [0] * (seats * width)
+        play_table_round(game, seat_bets, choose, insure, round_counts)
+        counts[r * seats * width:(r + 1) * seats * width] = round_counts
+        net.extend([int(balance) - UNLIMITED_BALANCE for balance in game.player_balances])
+        hands.extend([len(seat_hands) for seat_hands in game.player_hands])
+    return RoundBatch(np.array(net, dtype=np.int64).reshape(rounds, seats),
+                      np.array(hands, dtype=np.uint8).reshape(rounds, seats),
+                      np.array(counts, dtype=np.uint16).reshape(rounds, seats, width))
+
+
+class SimulationConfig(NamedTuple):
+    """What every worker plays; picklable so it can be shipped to the pool."""
+    num_players: int = 1
+    bet: int = 10 # Flat bet per seat, and the minimum bet of a ramp
+    take_insurance: bool = False # Always insure (otherwise a strategy table decides, or never)
+    strategy_path: Optional[str] = None # Strategy table (.npz); basic strategy when unset
+    count_system: Optional[str] = None # Key of counting.SYSTEMS to track the shoe with
+    ramp: Optional[str] = None # Bet ramp on the true count, e.g. "1:20,2:40,3:80"
+    history_path: Optional[str] = None # Hand-history log prefix; each table appends ".<table>"
+    compact: bool = False # Keep the seats in NumPy arrays (faster settlement with many seats)
+    double_after_split: bool = False # Table rule (BlackjackGame.double_after_split)
+    shoe_file: Optional[str] = None # Deal pre-shuffled shoes from this file (see shoe_file) instead of shuffling
+    penetration: Optional[float] = None # Fraction of the shoe dealt before the cut card; dealt down when unset
+    continuous_shuffle: bool = False # A continuous shuffling machine instead of a shoe
+    bankroll: int = 50 # Starting balance for the risk-of-ruin sessions
+    session_rounds: int = 100 # Rounds a session must last to survive
+    export_path: Optional[str] = None # Per-round Parquet/Arrow file; each table inserts ".<table>" before the suffix
+    checkpoint_path: Optional[str] = None # Checkpoint file prefix; each table appends ".<table>"
+    checkpoint_interval: float = checkpoint.DEFAULT_INTERVAL # Seconds between a worker's checkpoints
+
+
+def load_strategy(path: str, double_after_split: bool) -> StrategyTable:
+    """Loads a strategy table, refusing one generated for the other double-after-split rule."""
+    strategy = StrategyTable.load(path)
+    if strategy.double_after_split != double_after_split:
+        generated, played = ("with" if rule else "without" for rule in (strategy.double_after_split, double_after_split))
+        raise ValueError(f"{path} was generated {generated} --double-after-split, but the table is played {played} it")
+    return strategy
+
+
+class WorkerTable:
+    """A game set up as a config describes, with its policy, insurance rule, card counter and bet ramp.
+    With a shoe file, table `index` of `tables` deals every `tables`-th shoe from shoe `index` on."""
+
+    def __init__(self, config: SimulationConfig, rng: np.random.Generator, index: int = 0, tables: int = 1):
+        source = ShoeFile(config.shoe_file).reader(index, tables) if config.shoe_file else None
+        self.game = BlackjackGame(num_players=config.num_players, rng=rng, compact=config.compact,
+                                  double_after_split=config.double_after_split, shoe_source=source,
+                                  penetration=config.penetration, continuous_shuffle=config.continuous_shuffle)
+        self.bets = [config.bet] * config.num_players
+        self.policy: Union[Policy, StrategyTable] = basic_strategy
+        self.insure: Optional[Callable[[Hand], bool]] = None
+        if config.strategy_path:
+            strategy = load_strategy(config.strategy_path, config.double_after_split)
+            self.policy, self.insure = strategy, strategy.take_insurance
+        if config.take_insurance:
+            self.insure = always_insure
+        self.counter: Optional[CardCounter] = None
+        self.ramp: Optional[BetRamp] = None
+        if config.count_system:
+            self.counter = CardCounter(SYSTEMS[config.count_system], self.game.deck.num_decks)
+            self.game.deck.add_counter(self.counter)
+            if config.ramp:
+                self.ramp = BetRamp.parse(config.ramp, config.bet)
+        self.true_count = math.nan # When the latest round was dealt
+
+    def play(self, stats: SimulationStats) -> List[int]:
+        """Plays one round, betting on the ramp if there is one; returns play_round's action counts."""
+        self.game.prepare_deal() # Any reshuffle first, so the bet is sized on the shoe about to be dealt
+        if self.counter is not None:
+            self.true_count = self.counter.true_count
+            if self.ramp is not None:
+                self.bets = [self.ramp.bet_for(self.true_count)] * len(self.bets)
+        return play_round(self.game, self.bets, stats, self.policy, self.insure)
+
+
+def run_worker(rounds: int, seed: np.random.SeedSequence, config: SimulationConfig,
+               resume: bool = False, tables: int = 1) -> SimulationStats:
+    """Plays `rounds` rounds of one of the run's `tables` tables, on a private game seeded with its own stream.
+    Per-worker files and checkpoints are numbered by table.
+
+    The shoe is played continuously, so with a counting system the bet of each
+    round follows the ramp on the true count as the shoe is dealt down.
+    With a checkpoint path the worker saves its state every
+    `checkpoint_interval` seconds and when it finishes; `resume` continues
+    from the saved state, if there is one.
+    """
+    worker = seed.spawn_key[-1] if seed.spawn_key else 0
+    checkpoint_path = f"{config.checkpoint_path}.{worker}" if config.checkpoint_path else None
+    saved: Optional[checkpoint.WorkerCheckpoint] = None
+    if resume and checkpoint_path and os.path.exists(checkpoint_path):
+        saved = checkpoint.load(checkpoint_path)
+        settings = dict(saved.config, checkpoint_interval=config.checkpoint_interval) # May change between sessions
+        if (saved.entropy, saved.worker, saved.rounds, settings) != (seed.entropy, worker, rounds, config._asdict()):
+            raise ValueError(f"{checkpoint_path} was written by a run with other settings")
+
+    table = WorkerTable(config, np.random.default_rng(seed), worker, tables)
+    game = table.game
+    stats = SimulationStats(config.bankroll, config.session_rounds)
+    history_path = f"{config.history_path}.{worker}" if config.history_path else None
+    first_round, elapsed = 0, 0.0
+    if saved is not None:
+        saved.shoe.restore(game.deck) # After the counter is attached, so it is rebuilt too
+        vars(stats).update(saved.stats)
+        first_round, elapsed = saved.rounds_done, saved.elapsed
+        if history_path:
+            os.truncate(history_path, saved.history_size) # Drop rounds logged after the checkpoint
+    elif history_path:
+        open(history_path, "wb").close() # Starting at round 0: drop any log of an earlier run
+    if history_path:
+        game.history = HandHistoryWriter(history_path, seats=config.num_players)
+    exporter = RoundExporter(worker_path(config.export_path, worker)) if config.export_path else None
+
+    start = time.perf_counter()
+
+    def save_checkpoint(rounds_done: int):
+        history_size = 0
+        if game.history is not None:
+            game.history.close() # Waits for the log to reach the file, so its size is final
+            history_size = os.path.getsize(history_path)
+            game.history = HandHistoryWriter(history_path, seats=config.num_players)
+        game.return_discards() # A continuous shuffler's state includes the cards of the round just played
+        checkpoint.save(checkpoint_path, checkpoint.WorkerCheckpoint(
+            seed.entropy, worker, rounds, config._asdict(), rounds_done, checkpoint.ShoeState.capture(game.deck),
+            vars(stats), elapsed + time.perf_counter() - start, history_size))
+
+    next_checkpoint = start + config.checkpoint_interval
+    for round_number in range(first_round, rounds):
+        counts = table.play(stats)
+        if exporter is not None:
+            export_round(exporter, round_number, game, table.bets, counts, table.true_count)
+        if checkpoint_path and time.perf_counter() >= next_checkpoint:
+            save_checkpoint(round_number + 1)
+            next_checkpoint = time.perf_counter() + config.checkpoint_interval
+    if checkpoint_path:
+        save_checkpoint(rounds)
+    if game.history is not None:
+        game.history.close()
+    if exporter is not None:
+        exporter.close()
+    stats.elapsed = elapsed + time.perf_counter() - start
+    return stats
+
+
+def split_rounds(rounds: int, tables: int) -> List[int]:
+    """Equal shares of `rounds`, the first tables taking one more when it does not divide."""
+    return [rounds // tables + (1 if t < rounds % tables else 0) for t in range(tables)]
+
+
+def simulate(rounds: int, workers: Optional[int] = None, seed: Optional[int] = None,
+             config: Optional[SimulationConfig] = None, resume: bool = False, tables: Optional[int] = None,
+             **options) -> SimulationStats:
+    """Plays `rounds` table rounds spread over `workers` processes and merges their statistics.
+
+    Table options come from `config`, or from keyword arguments naming
+    SimulationConfig fields. The rounds are shared equally between `tables`
+    tables (DEFAULT_TABLES by default), each with its own child of the seed's
+    ``SeedSequence``; the workers play them and the results are merged in
+    table order, so they depend only on the seed and table count, never on
+    the number of workers.
+
+    `resume` continues an interrupted run from its checkpoints; rounds,
+    tables and options must match the original run. Its seed is read back
+    from the checkpoints when `seed` is None.
+    """
+    config = config or SimulationConfig(**options)
+    if resume and config.export_path:
+        raise ValueError("Per-round exports cannot be resumed")
+    workers = workers or os.cpu_count() or 1
+    tables = tables or DEFAULT_TABLES
+    shares = split_rounds(rounds, tables)
+    if resume and seed is None and config.checkpoint_path and os.path.exists(f"{config.checkpoint_path}.0"):
+        seed = checkpoint.load(f"{config.checkpoint_path}.0").entropy
+    seeds = np.random.SeedSequence(seed).spawn(tables)
+
+    start = time.perf_counter()
+    total = SimulationStats(config.bankroll, config.session_rounds)
+    if workers == 1:
+        results = [run_worker(share, s, config, resume, tables) for share, s in zip(shares, seeds) if share]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_worker, share, s, config, resume, tables)
+                       for share, s in zip(shares, seeds) if share]
+            results = [future.result() for future in futures]
+    for stats in results:
+        total.merge(stats)
+    # A resumed run counts the time its workers played before the interruption
+    total.elapsed = max([time.perf_counter() - start] + [stats.elapsed for stats in results])
+    return total
+
+
+def add_table_arguments(parser: argparse.ArgumentParser):
+    """The table options of SimulationConfig, shared with paired.py."""
+    parser.add_argument("--players", type=int, default=1, help="Seats at the table")
+    parser.add_argument("--bet", type=int, default=10, help="Initial bet per seat")
+    parser.add_argument("--insurance", action="store_true", help="Always take insurance when offered")
+    parser.add_argument("--strategy", default=None, help="Strategy table (.npz) from strategy_table.py")
+    parser.add_argument("--count", choices=sorted(SYSTEMS), default=None, help="Counting system to track")
+    parser.add_argument("--ramp", default=None, help='Bet ramp on the true count, e.g. "1:20,2:40,3:80" (needs --count)')
+    parser.add_argument("--double-after-split", action="store_true", help="Allow doubling down on split hands")
+    parser.add_argument("--compact", action="store_true", help="Store the seats in NumPy arrays (for large tables)")
+    parser.add_argument("--shoe-file", default=None, help="Deal pre-shuffled shoes from a file written by shoe_file.py")
+    parser.add_argument("--penetration", type=float, default=None, help="Place the cut card at this fraction of the shoe")
+    parser.add_argument("--csm", action="store_true", help="Deal from a continuous shuffling machine")
+    parser.add_argument("--bankroll", type=int, default=50, help="Starting bankroll for the risk of ruin")
+    parser.add_argument("--session-rounds", type=int, default=100, help="Rounds a session must survive")
+
+
+def table_config(args: argparse.Namespace, **fields) -> SimulationConfig:
+    """The SimulationConfig of parsed table options; `fields` sets the others."""
+    return SimulationConfig(num_players=args.players, bet=args.bet, take_insurance=args.insurance,
+                            strategy_path=args.strategy, count_system=args.count, ramp=args.ramp,
+                            compact=args.compact, double_after_split=args.double_after_split, shoe_file=args.shoe_file,
+                            penetration=args.penetration, continuous_shuffle=args.csm,
+                            bankroll=args.bankroll, session_rounds=args.session_rounds, **fields)
+
+
+def check_table_options(parser: argparse.ArgumentParser, args: argparse.Namespace):
+    """Exits with a usage error for table options that cannot be played together."""
+    if args.ramp and not args.count:
+        parser.error("--ramp needs --count")
+    if args.count and args.csm:
+        parser.error("--count needs a shoe, not --csm")
+    if args.strategy:
+        try:
+            load_strategy(args.strategy, args.double_after_split)
+        except ValueError as error:
+            parser.error(str(error))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of the Blackjack rules engine.")
+    parser.add_argument("--rounds", type=int, default=100000, help="Table rounds to play")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=None, help="Master seed for reproducible runs")
+    parser.add_argument("--tables", type=int, default=DEFAULT_TABLES,
+                        help="Independent RNG streams to split the rounds between (default: %(default)s)")
+    add_table_arguments(parser)
+    parser.add_argument("--history", default=None, help="Write a hand-history log per table to HISTORY.<table>")
+    parser.add_argument("--export", default=None, help="Write per-round rows to EXPORT (.parquet or .arrow), one file per table")
+    parser.add_argument("--checkpoint", default=None, help="Save each table's progress to CHECKPOINT.<table>")
+    parser.add_argument("--checkpoint-interval", type=float, default=checkpoint.DEFAULT_INTERVAL,
+                        help="Seconds between checkpoints")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run from its checkpoints")
+    args = parser.parse_args()
+
+    check_table_options(parser, args)
+    if args.resume and not args.checkpoint:
+        parser.error("--resume needs --checkpoint")
+    if args.resume and args.export:
+        parser.error("--export cannot be resumed")
+    if args.history and max(BetRamp.parse(args.ramp, args.bet).bets if args.ramp else [args.bet]) > MAX_BET:
+        parser.error(f"--history logs bets of at most £{MAX_BET:,}")
+    config = table_config(args, history_path=args.history, export_path=args.export,
+                          checkpoint_path=args.checkpoint, checkpoint_interval=args.checkpoint_interval)
+    try:
+        stats = simulate(args.rounds, workers=args.workers, seed=args.seed, config=config, resume=args.resume,
+                         tables=args.tables)
+    except ValueError as error: # A checkpoint that does not match the options
+        parser.error(str(error))
+    print(stats.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Basic strategy for the rules enforced by ``engine.BlackjackGame``.
+
+Six decks, dealer hits soft 17, no double after split, a single split only and
+split aces take one card each. Decisions are returned as action names that the
+simulator maps onto the game's methods.
+"""
+from cards import Card
+from hand import Hand
+
+HIT = "hit"
+STAND = "stand"
+DOUBLE = "double"
+SPLIT = "split"
+
+
+def upcard_value(card: Card) -> int:
+    """Dealer upcard as 2-11 (Ace is 11)."""
+    return card.get_value()
+
+
+def basic_strategy(hand: Hand, upcard: Card, can_double: bool, can_split: bool) -> str:
+    """Chooses hit/stand/double/split for a player hand against the dealer upcard."""
+    up = upcard_value(upcard)
+
+    # --- Pairs (no double after split, so 4s are never split) ---
+    if can_split and len(hand) == 2 and hand[0].get_value() == hand[1].get_value():
+        pair = hand[0].get_value()
+        if pair == 11 or pair == 8:
+            return SPLIT
+        if pair in (2, 3) and 4 <= up <= 7:
+            return SPLIT
+        if pair == 6 and 3 <= up <= 6:
+            return SPLIT
+        if pair == 7 and up <= 7:
+            return SPLIT
+        if pair == 9 and up not in (7, 10, 11):
+            return SPLIT
+        # 4s, 5s and 10s fall through to the hard totals
+
+    total, soft = hand.value.total, hand.value.soft
+
+    # --- Soft totals ---
+    if soft:
+        if total >= 20:
+            return STAND
+        if total == 19:
+            return DOUBLE if can_double and up == 6 else STAND
+        if total == 18:
+            if up <= 6:
+                return DOUBLE if can_double else STAND
+            return STAND if up in (7, 8) else HIT
+        if total == 17 and 3 <= up <= 6:
+            return DOUBLE if can_double else HIT
+        if total in (15, 16) and 4 <= up <= 6:
+            return DOUBLE if can_double else HIT
+        if total in (13, 14) and 5 <= up <= 6:
+            return DOUBLE if can_double else HIT
+        return HIT
+
+    # --- Hard totals ---
+    if total >= 17:
+        return STAND
+    if 13 <= total <= 16:
+        return STAND if up <= 6 else HIT
+    if total == 12:
+        return STAND if 4 <= up <= 6 else HIT
+    if total == 11:
+        return DOUBLE if can_double else HIT
+    if total == 10:
+        return DOUBLE if can_double and up <= 9 else HIT
+    if total == 9:
+        return DOUBLE if can_double and 3 <= up <= 6 else HIT
+    return HIT
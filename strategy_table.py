@@ -0,0 +1,270 @@
+"""Two-card strategy tables for the ``BlackjackGame`` rules.
+
+Decisions depend on the player's first two cards and the dealer upcard, not
+just on the hand total. For every such deal the generator removes those
+three cards from the shoe and values stand, hit, double and split against
+that post-deal composition: the dealer distribution comes from
+``dealer_odds`` and every player draw is weighted by the same composition.
+Cards the player draws later are not removed, and a split hand ignores the
+other hand's cards, so these are post-deal approximations of the expected
+values rather than exact composition-dependent ones. The result is a
+``StrategyTable`` of small uint8 arrays that answers any decision with a few
+array indexes.
+
+Rules modelled, as the game enforces them: dealer hits soft 17; an Ace upcard
+goes through insurance first, so later decisions are conditioned on no dealer
+Blackjack; with a ten upcard there is no peek and a dealer Blackjack plays as
+21; doubling only on the first two cards, and after a split only under the
+double-after-split rule; one split of the initial hand; split Aces take one
+card each. Every wager is settled at its full amount, as ``evaluate_winner``
+does: a doubled bet wins or loses two units and each split hand wins or
+loses its own unit.
+
+Usage:
+    python strategy_table.py --decks 6 --out strategy_6d.npz
+    python strategy_table.py --decks 6 --double-after-split --out strategy_6d_das.npz
+"""
+import argparse
+import itertools
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from cards import Card
+from dealer_odds import NUM_RANKS, DealerOutcome, dealer_probabilities, full_shoe
+from hand import Hand
+from hand_values import hand_value
+from strategy import DOUBLE, HIT, SPLIT, STAND
+
+ACTIONS = (STAND, HIT, DOUBLE, SPLIT) # Index = stored action code
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+ACE = 0 # Rank index of an Ace; index 9 is every ten-value card
+MAX_TOTAL = 21
+
+# Columns of StrategyTable.initial: which extra options the hand still has
+ALL_OPTIONS, NO_SPLIT, HIT_STAND = 0, 1, 2
+
+# A card of each rank index, for building the hands a policy is asked about
+RANK_CARDS = tuple(Card('Spades', value) for value in ('A', '2', '3', '4', '5', '6', '7', '8', '9', '10'))
+
+
+def _stand_values(dealer: DealerOutcome, upcard: int) -> np.ndarray:
+    """Expected value of standing on each total 0-21 against the dealer distribution."""
+    finals = [dealer.p17, dealer.p18, dealer.p19, dealer.p20, dealer.p21]
+    if upcard == 10:
+        finals[4] += dealer.blackjack # No peek: a dealer natural simply plays as 21
+    ev = np.empty(MAX_TOTAL + 1)
+    for total in range(MAX_TOTAL + 1):
+        win = dealer.bust + sum(p for final, p in enumerate(finals, 17) if final < total)
+        lose = sum(p for final, p in enumerate(finals, 17) if final > total)
+        ev[total] = win - lose
+    return ev
+
+
+class _HandEvaluator:
+    """Post-deal EVs for one (composition, upcard) situation, memoized per hand state.
+    Every draw uses the same `draw_probabilities` (no depletion by the hand's own cards)."""
+
+    def __init__(self, stand_ev: np.ndarray, draw_probabilities: np.ndarray):
+        self.stand_ev = stand_ev
+        self.p = draw_probabilities
+        self.hit_memo: Dict[Tuple[int, bool], float] = {}
+
+    @staticmethod
+    def total(hard: int, has_ace: bool) -> int:
+        return hard + 10 if has_ace and hard + 10 <= MAX_TOTAL else hard
+
+    def stand(self, hard: int, has_ace: bool) -> float:
+        if hard > MAX_TOTAL:
+            return -1.0
+        return self.stand_ev[self.total(hard, has_ace)]
+
+    def best(self, hard: int, has_ace: bool) -> float:
+        """Value of a hand that may still hit or stand."""
+        if hard > MAX_TOTAL:
+            return -1.0
+        return max(self.stand(hard, has_ace), self.hit(hard, has_ace))
+
+    def hit(self, hard: int, has_ace: bool) -> float:
+        key = (hard, has_ace)
+        if key not in self.hit_memo:
+            self.hit_memo[key] = sum(self.p[r] * self.best(hard + r + 1, has_ace or r == ACE)
+                                     for r in range(NUM_RANKS) if self.p[r])
+        return self.hit_memo[key]
+
+    def double(self, hard: int, has_ace: bool) -> float:
+        return 2 * sum(self.p[r] * self.stand(hard + r + 1, has_ace or r == ACE)
+                       for r in range(NUM_RANKS) if self.p[r])
+
+    def split(self, rank: int, double_after_split: bool = False) -> float:
+        """Both hands of a split pair, each finished without splitting again (or doubling, unless allowed)."""
+        one_hand = 0.0
+        for r in range(NUM_RANKS):
+            if not self.p[r]:
+                continue
+            hard, has_ace = rank + 1 + r + 1, rank == ACE or r == ACE
+            if rank == ACE or self.total(hard, has_ace) == MAX_TOTAL:
+                one_hand += self.p[r] * self.stand(hard, has_ace) # Split Aces and split 21s stand
+            elif double_after_split:
+                one_hand += self.p[r] * max(self.best(hard, has_ace), self.double(hard, has_ace))
+            else:
+                one_hand += self.p[r] * self.best(hard, has_ace)
+        return 2 * one_hand
+
+
+class StrategyTable:
+    """Decisions for every (first two cards, dealer upcard), queried in O(1).
+
+    Arrays are indexed by rank index (Ace = 0 ... ten-value = 9):
+    ``initial[c1, c2, up, options]`` is the first decision on a two-card hand,
+    ``totals[c1, c2, up, soft, total]`` is hit/stand for any later hand that
+    started from c1, c2 (split hands past two cards use the pair), and
+    ``insurance[c1, c2]`` says whether to insure against an Ace. A two-card
+    split hand that may double is looked up in ``initial`` by its own cards.
+    `double_after_split` records the rule the table was built for.
+    """
+
+    def __init__(self, initial: np.ndarray, totals: np.ndarray, insurance: np.ndarray, num_decks: int,
+                 double_after_split: bool = False):
+        self.initial = initial
+        self.totals = totals
+        self.insurance = insurance
+        self.num_decks = num_decks
+        self.double_after_split = double_after_split
+        # Flat list copies for scalar lookups, which are much cheaper than indexing the arrays
+        self._initial_codes = initial.ravel().tolist()
+        self._total_codes = totals.ravel().tolist()
+
+    def decide(self, hand: Hand, upcard: Card, can_double: bool, can_split: bool) -> str:
+        """Same signature as strategy.basic_strategy, so either can drive the simulator."""
+        return ACTIONS[self.decide_code(hand, upcard, can_double, can_split)]
+
+    def decide_code(self, hand: Hand, upcard: Card, can_double: bool, can_split: bool) -> int:
+        """``decide`` as an index into ACTIONS, for callers that dispatch on codes."""
+        cards = hand.cards
+        first = cards[0].hard - 1
+        up = upcard.hard - 1
+        if len(cards) == 2 and (can_double or can_split):
+            options = ALL_OPTIONS if can_split else NO_SPLIT if can_double else HIT_STAND
+            state = (first * NUM_RANKS + cards[1].hard - 1) * NUM_RANKS + up # Index of [first, second, up]
+            return self._initial_codes[state * 3 + options]
+        second = first if hand.from_split else cards[1].hard - 1
+        state = (first * NUM_RANKS + second) * NUM_RANKS + up
+        value = hand.value
+        if value.bust:
+            return ACTION_CODES[STAND]
+        return self._total_codes[(state * 2 + value.soft) * (MAX_TOTAL + 1) + value.total]
+
+    def take_insurance(self, hand: Hand) -> bool:
+        return bool(self.insurance[hand.cards[0].hard - 1, hand.cards[1].hard - 1])
+
+    def save(self, path: str):
+        np.savez_compressed(path, initial=self.initial, totals=self.totals, insurance=self.insurance,
+                            num_decks=self.num_decks, double_after_split=self.double_after_split)
+
+    @classmethod
+    def load(cls, path: str) -> "StrategyTable":
+        with np.load(path) as data:
+            double_after_split = bool(data["double_after_split"]) if "double_after_split" in data else False
+            return cls(data["initial"], data["totals"], data["insurance"], int(data["num_decks"]), double_after_split)
+
+    @classmethod
+    def from_policy(cls, policy: Callable[[Hand, Card, bool, bool], str],
+                    insure: Optional[Callable[[Hand], bool]] = None, num_decks: int = 6,
+                    double_after_split: bool = False) -> "StrategyTable":
+        """Tabulates a policy such as ``strategy.basic_strategy`` by asking it about every state.
+
+        First decisions are asked on the actual two cards. Later decisions are
+        asked on a representative hand of the same total and softness, so the
+        policy may only look at the hand's value there (as basic strategy does).
+        """
+        initial = np.zeros((NUM_RANKS, NUM_RANKS, NUM_RANKS, 3), dtype=np.uint8)
+        totals = np.zeros((NUM_RANKS, NUM_RANKS, NUM_RANKS, 2, MAX_TOTAL + 1), dtype=np.uint8)
+        insurance = np.zeros((NUM_RANKS, NUM_RANKS), dtype=bool)
+        later = _representative_hands()
+        for c1, c2, up in itertools.product(range(NUM_RANKS), repeat=3):
+            hand = Hand([RANK_CARDS[c1], RANK_CARDS[c2]])
+            upcard = RANK_CARDS[up]
+            initial[c1, c2, up, ALL_OPTIONS] = ACTION_CODES[policy(hand, upcard, True, c1 == c2)]
+            initial[c1, c2, up, NO_SPLIT] = ACTION_CODES[policy(hand, upcard, True, False)]
+            initial[c1, c2, up, HIT_STAND] = ACTION_CODES[policy(hand, upcard, False, False)]
+            for (soft, total), cards in later.items():
+                totals[c1, c2, up, soft, total] = ACTION_CODES[policy(Hand(cards), upcard, False, False)]
+            if insure is not None:
+                insurance[c1, c2] = insure(hand)
+        return cls(initial, totals, insurance, num_decks, double_after_split)
+
+
+def _representative_hands() -> Dict[Tuple[int, int], List[Card]]:
+    """A hand for every reachable (soft, total) of 21 or less, with three cards where possible."""
+    hands: Dict[Tuple[int, int], List[Card]] = {}
+    for size in (3, 2):
+        for ranks in itertools.combinations_with_replacement(range(NUM_RANKS), size):
+            cards = [RANK_CARDS[rank] for rank in ranks]
+            value = hand_value(cards)
+            if not value.bust:
+                hands.setdefault((int(value.soft), value.total), cards)
+    return hands
+
+
+def generate_table(num_decks: int = 6, double_after_split: bool = False) -> StrategyTable:
+    """Builds the full table for a fresh `num_decks` shoe, under the given double-after-split rule."""
+    shoe = full_shoe(num_decks)
+    initial = np.zeros((NUM_RANKS, NUM_RANKS, NUM_RANKS, 3), dtype=np.uint8)
+    totals = np.zeros((NUM_RANKS, NUM_RANKS, NUM_RANKS, 2, MAX_TOTAL + 1), dtype=np.uint8)
+    insurance = np.zeros((NUM_RANKS, NUM_RANKS), dtype=bool)
+
+    for c1 in range(NUM_RANKS):
+        for c2 in range(c1, NUM_RANKS):
+            for up in range(NUM_RANKS):
+                counts = list(shoe)
+                for rank in (c1, c2, up):
+                    counts[rank] -= 1
+                if min(counts) < 0:
+                    continue
+                composition = tuple(counts)
+                dealer = dealer_probabilities(up + 1, composition, given_no_blackjack=(up == ACE))
+                draws = np.array(composition, dtype=float) / sum(composition)
+                hand = _HandEvaluator(_stand_values(dealer, up + 1), draws)
+
+                # Hit or stand on every total this starting hand can grow into
+                for hard in range(2, MAX_TOTAL + 1):
+                    for has_ace in (False, True):
+                        total = hand.total(hard, has_ace)
+                        code = ACTION_CODES[HIT if hand.hit(hard, has_ace) > hand.stand(hard, has_ace) else STAND]
+                        totals[c1, c2, up, int(total != hard), total] = code
+                        totals[c2, c1, up, int(total != hard), total] = code
+
+                hard, has_ace = c1 + c2 + 2, ACE in (c1, c2)
+                if has_ace and hard == 11:
+                    continue # A natural is paid at once; the zero code already means stand
+                candidates = {STAND: hand.stand(hard, has_ace), HIT: hand.hit(hard, has_ace)}
+                initial[c1, c2, up, HIT_STAND] = initial[c2, c1, up, HIT_STAND] = ACTION_CODES[max(candidates, key=candidates.get)]
+                candidates[DOUBLE] = hand.double(hard, has_ace)
+                initial[c1, c2, up, NO_SPLIT] = initial[c2, c1, up, NO_SPLIT] = ACTION_CODES[max(candidates, key=candidates.get)]
+                if c1 == c2:
+                    candidates[SPLIT] = hand.split(c1, double_after_split)
+                initial[c1, c2, up, ALL_OPTIONS] = initial[c2, c1, up, ALL_OPTIONS] = ACTION_CODES[max(candidates, key=candidates.get)]
+
+                if up == ACE:
+                    # Insurance pays 2:1 on half the bet: worth it when a ten is more than 1 in 3 of the unseen cards
+                    insurance[c1, c2] = insurance[c2, c1] = draws[9] > 1 / 3
+    return StrategyTable(initial, totals, insurance, num_decks, double_after_split)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a two-card strategy table from the post-deal composition.")
+    parser.add_argument("--decks", type=int, default=6, help="Decks in the shoe")
+    parser.add_argument("--double-after-split", action="store_true", help="Build for a table that allows doubling on split hands")
+    parser.add_argument("--out", default="strategy_6d.npz", help="Output .npz file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = generate_table(args.decks, args.double_after_split)
+    table.save(args.out)
+    print(f"Wrote {args.out} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
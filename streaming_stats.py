@@ -0,0 +1,204 @@
+"""Constant-memory accumulators for long simulations.
+
+Every accumulator here takes results one at a time or as a NumPy batch,
+keeps a fixed amount of state however many results it has seen, and merges
+with the same accumulator from another worker. ``simulate.SimulationStats``
+combines them into the results object of a run; any estimate, confidence
+intervals included, can be read off at any point while it is filling up.
+"""
+import math
+from statistics import NormalDist
+from typing import Tuple
+
+import numpy as np
+
+
+def z_score(level: float) -> float:
+    """Two-sided normal quantile, e.g. 1.96 for a 95% interval."""
+    return NormalDist().inv_cdf(0.5 + level / 2)
+
+
+class RunningMoments:
+    """Mean and variance by Welford's update; batches and workers combine with Chan's formula."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0 # Sum of squared deviations from the mean
+
+    def add(self, x: float):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def add_batch(self, values: np.ndarray):
+        if values.size:
+            mean = float(values.mean())
+            self._combine(values.size, mean, float(np.square(values - mean).sum()))
+
+    def merge(self, other: "RunningMoments"):
+        if other.count:
+            self._combine(other.count, other.mean, other.m2)
+
+    def _combine(self, count: int, mean: float, m2: float):
+        total = self.count + count
+        delta = mean - self.mean
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.mean += delta * count / total
+        self.count = total
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def standard_error(self) -> float:
+        return math.sqrt(self.variance / self.count) if self.count > 1 else 0.0
+
+    def confidence_interval(self, level: float = 0.95) -> Tuple[float, float]:
+        half = z_score(level) * self.standard_error
+        return self.mean - half, self.mean + half
+
+
+class OutcomeHistogram:
+    """Counts of round results in half-bet steps, from -MAX_BETS to +MAX_BETS bets."""
+    MAX_BETS = 4 # Two split hands, both doubled; a lost insurance bet on top lands in the end bin
+    STEPS = 2 # Bins per bet
+
+    def __init__(self):
+        self.counts = [0] * (2 * self.MAX_BETS * self.STEPS + 1) # A list: single updates are far cheaper than on an array
+
+    def add(self, net: int, bet: int):
+        offset = self.MAX_BETS * self.STEPS
+        self.counts[min(max(round(net * self.STEPS / bet), -offset), offset) + offset] += 1
+
+    def add_batch(self, net: np.ndarray, bets: np.ndarray):
+        offset = self.MAX_BETS * self.STEPS
+        bins = np.clip(np.rint(net * self.STEPS / bets), -offset, offset).astype(np.intp) + offset
+        self._add_counts(np.bincount(bins, minlength=len(self.counts)).tolist())
+
+    def merge(self, other: "OutcomeHistogram"):
+        self._add_counts(other.counts)
+
+    def _add_counts(self, counts):
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, counts)]
+
+    @property
+    def bins(self) -> np.ndarray:
+        """Result of each bin, in bets."""
+        offset = self.MAX_BETS * self.STEPS
+        return (np.arange(len(self.counts)) - offset) / self.STEPS
+
+    def frequencies(self) -> np.ndarray:
+        counts = np.array(self.counts, dtype=float)
+        total = counts.sum()
+        return counts / total if total else counts
+
+
+class BankrollTracker:
+    """Running bankroll of each player (a seat, or a lockstep lane).
+
+    Tracks the deepest drawdown of each player's cumulative result, and the
+    risk of ruin: play is cut into sessions of `session_rounds` rounds that
+    start from `bankroll`, and a session is ruined if the balance ever fails
+    to cover the bet just played. Every session is judged when its last round
+    is played, so sessions still in progress count neither way.
+    """
+
+    def __init__(self, bankroll: int = 50, session_rounds: int = 100):
+        self.bankroll = bankroll # The game's starting balance
+        self.session_rounds = session_rounds
+        self.ruined = 0 # Finished sessions
+        self.survived = 0
+        self.worst_merged = 0 # Deepest drawdown of players merged in from other workers
+        # Per player, grown as players appear
+        self.total = np.zeros(0, dtype=np.int64) # Cumulative result
+        self.peak = np.zeros(0, dtype=np.int64)
+        self.drawdown = np.zeros(0, dtype=np.int64) # Deepest fall from a peak so far
+        self.balance = np.zeros(0, dtype=np.int64) # In the current session
+        self.session = np.zeros(0, dtype=np.int64) # Rounds into the current session
+        self.broke = np.zeros(0, dtype=bool) # The current session has been ruined
+
+    def _resize(self, players: int):
+        grow = players - self.total.size
+        if grow > 0:
+            zeros = np.zeros(grow, dtype=np.int64)
+            self.total = np.concatenate([self.total, zeros])
+            self.peak = np.concatenate([self.peak, zeros])
+            self.drawdown = np.concatenate([self.drawdown, zeros])
+            self.balance = np.concatenate([self.balance, zeros + self.bankroll])
+            self.session = np.concatenate([self.session, zeros])
+            self.broke = np.concatenate([self.broke, np.zeros(grow, dtype=bool)])
+
+    def add(self, player: int, net: int, bet: int):
+        """One round of one player."""
+        if player >= self.total.size:
+            self._resize(player + 1)
+        total = self.total.item(player) + net
+        peak = max(self.peak.item(player), total)
+        self.total[player] = total
+        self.peak[player] = peak
+        if peak - total > self.drawdown.item(player):
+            self.drawdown[player] = peak - total
+        balance = self.balance.item(player) + net
+        rounds = self.session.item(player) + 1
+        broke = self.broke.item(player) or balance < bet
+        if rounds >= self.session_rounds:
+            if broke:
+                self.ruined += 1
+            else:
+                self.survived += 1
+            balance, rounds, broke = self.bankroll, 0, False
+        self.balance[player] = balance
+        self.session[player] = rounds
+        self.broke[player] = broke
+
+    def add_batch(self, net: np.ndarray, bets: np.ndarray):
+        """One round of players 0..len(net)-1 at once."""
+        self._resize(net.size)
+        players = slice(0, net.size)
+        self.total[players] += net
+        np.maximum(self.peak[players], self.total[players], out=self.peak[players])
+        np.maximum(self.drawdown[players], self.peak[players] - self.total[players], out=self.drawdown[players])
+        self.balance[players] += net
+        self.session[players] += 1
+        self.broke[players] |= self.balance[players] < bets
+        finished = self.session[players] >= self.session_rounds
+        ruined = int(np.count_nonzero(self.broke[players] & finished))
+        self.ruined += ruined
+        self.survived += int(np.count_nonzero(finished)) - ruined
+        restart = np.flatnonzero(finished)
+        self.balance[restart] = self.bankroll
+        self.session[restart] = 0
+        self.broke[restart] = False
+
+    def merge(self, other: "BankrollTracker"):
+        """Adds another worker's players. Their sessions still in progress are not counted."""
+        self.ruined += other.ruined
+        self.survived += other.survived
+        self.worst_merged = max(self.worst_merged, other.max_drawdown)
+
+    @property
+    def max_drawdown(self) -> int:
+        """Deepest fall of any player's cumulative result from its running peak."""
+        return max(self.worst_merged, int(self.drawdown.max(initial=0)))
+
+    @property
+    def sessions(self) -> int:
+        return self.ruined + self.survived
+
+    @property
+    def risk_of_ruin(self) -> float:
+        return self.ruined / self.sessions if self.sessions else 0.0
+
+    def risk_of_ruin_interval(self, level: float = 0.95) -> Tuple[float, float]:
+        """Wilson score interval for the risk of ruin."""
+        n = self.sessions
+        if not n:
+            return 0.0, 1.0
+        z = z_score(level)
+        p = self.risk_of_ruin
+        centre = (p + z * z / (2 * n)) / (1 + z * z / n)
+        half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+        return max(0.0, centre - half), min(1.0, centre + half)
@@ -0,0 +1,35 @@
+"""HTML for the cards and hand totals drawn by the Streamlit table.
+
+A hand's markup depends only on its cards, so it is built once per distinct
+hand and then served from a bounded LRU cache keyed by the card ids.
+"""
+from functools import lru_cache
+from typing import Tuple
+
+from cards import CARDS
+from hand_values import hand_value
+
+HTML_CACHE_SIZE = 4096 # Distinct hands kept per process
+
+HIDDEN_CARD_HTML = ('<div class="card" style="background-color: grey; color: grey; display: flex; '
+                    'align-items: center; justify-content: center;">HIDDEN</div>')
+
+
+@lru_cache(maxsize=HTML_CACHE_SIZE)
+def hand_html(card_ids: Tuple[int, ...], hidden: int = 0) -> str:
+    """A hand container with the cards face up followed by `hidden` face-down placeholders."""
+    if not card_ids and not hidden:
+        return '<div class="hand-container">(No cards)</div>'
+    faces = "".join(CARDS[card_id].html for card_id in card_ids)
+    return f'<div class="hand-container">{faces}{HIDDEN_CARD_HTML * hidden}</div>'
+
+
+@lru_cache(maxsize=HTML_CACHE_SIZE)
+def total_html(card_ids: Tuple[int, ...], label: str = "Total") -> str:
+    value = hand_value([CARDS[card_id] for card_id in card_ids])
+    return f'<div class="hand-total">{label}: {value.display}</div>'
+
+
+def card_ids(cards) -> Tuple[int, ...]:
+    """Cache key for a hand or list of cards."""
+    return tuple(card.id for card in cards)
@@ -0,0 +1,276 @@
+"""Struct-of-arrays seat state for tables with many seats.
+
+``TableState`` keeps every seat's hands, bets, flags and balances in NumPy
+arrays with a fixed number of hand slots per seat (one split is allowed, so
+two). Round settlement, insurance and Blackjack payouts are computed for all
+seats at once with array operations instead of per-seat Python loops.
+
+``BlackjackGame(compact=True)`` stores its seats here. The game, the UI and the
+simulator keep using the list-of-``Hand`` interface through the adapters at
+the bottom of this module: ``SeatsView`` stands in for ``player_hands`` and
+``HandView`` behaves like a ``Hand`` backed by one slot of the arrays.
+"""
+from typing import Iterator, List, Sequence
+
+import numpy as np
+
+from cards import CARDS, Card
+from hand_values import BEST_TOTALS, HAND_VALUE_TABLE, HandValue
+
+MAX_HANDS = 2 # Hand slots per seat: the dealt hand and one split
+MAX_CARDS = 22 # A hard 21 of Aces and small cards, plus the card that busts it
+
+
+class TableState:
+    def __init__(self, num_seats: int, balance: int = 50, bet: int = 5):
+        shape = (num_seats, MAX_HANDS)
+        self.num_seats = num_seats
+        self.cards = np.zeros(shape + (MAX_CARDS,), dtype=np.uint8) # Card ids
+        self.num_cards = np.zeros(shape, dtype=np.uint8)
+        self.hard = np.zeros(shape, dtype=np.uint8) # Total with every Ace counted as 1
+        self.aces = np.zeros(shape, dtype=np.uint8)
+        self.bets = np.zeros(shape, dtype=np.int64)
+        self.stood = np.zeros(shape, dtype=bool)
+        self.doubled = np.zeros(shape, dtype=bool)
+        self.from_split = np.zeros(shape, dtype=bool)
+        self.num_hands = np.ones(num_seats, dtype=np.uint8)
+        self.balances = np.full(num_seats, balance, dtype=np.int64)
+        self.insurance_bets = np.zeros(num_seats, dtype=np.int64)
+        self.insurance_decided = np.zeros(num_seats, dtype=bool)
+        self.split_flags = np.zeros(num_seats, dtype=bool)
+        self.bets[:, 0] = bet
+
+    def start_round(self, bets: Sequence[int]):
+        """Clears every hand and places `bets` on each seat's first hand."""
+        self.num_cards[:] = 0
+        self.hard[:] = 0
+        self.aces[:] = 0
+        self.bets[:] = 0
+        self.bets[:, 0] = bets
+        self.stood[:] = False
+        self.doubled[:] = False
+        self.from_split[:] = False
+        self.num_hands[:] = 1
+        self.insurance_bets[:] = 0
+        self.insurance_decided[:] = False
+        self.split_flags[:] = False
+
+    # --- Cards ---
+
+    def add_card(self, seat: int, hand: int, card_id: int):
+        card = CARDS[card_id]
+        n = self.num_cards[seat, hand]
+        self.cards[seat, hand, n] = card_id
+        self.num_cards[seat, hand] = n + 1
+        self.hard[seat, hand] += card.hard
+        self.aces[seat, hand] += card.is_ace
+
+    def deal_initial(self, card_ids: np.ndarray):
+        """Deals two cards to every seat's first hand from `card_ids` (length 2 * seats, seat order)."""
+        pairs = np.asarray(card_ids, dtype=np.uint8).reshape(self.num_seats, 2)
+        self.cards[:, 0, :2] = pairs
+        self.num_cards[:, 0] = 2
+        hard = _CARD_HARD[pairs]
+        self.hard[:, 0] = hard.sum(axis=1)
+        self.aces[:, 0] = (hard == 1).sum(axis=1)
+
+    def split(self, seat: int, hand: int) -> int:
+        """Splits the pair in `hand` into two one-card hands; returns the new hand's slot."""
+        new = int(self.num_hands[seat])
+        first, second = self.cards[seat, hand, :2]
+        for slot, card_id in ((hand, first), (new, second)):
+            card = CARDS[card_id]
+            self.cards[seat, slot, 0] = card_id
+            self.num_cards[seat, slot] = 1
+            self.hard[seat, slot] = card.hard
+            self.aces[seat, slot] = card.is_ace
+            self.bets[seat, slot] = self.bets[seat, hand]
+            self.stood[seat, slot] = False
+            self.doubled[seat, slot] = False
+            self.from_split[seat, slot] = True
+        self.num_hands[seat] = new + 1
+        return new
+
+    # --- Whole-table values ---
+
+    def active(self) -> np.ndarray:
+        """Mask of hand slots in use this round."""
+        return np.arange(MAX_HANDS) < self.num_hands[:, None]
+
+    def totals(self) -> np.ndarray:
+        return BEST_TOTALS[self.hard, self.aces]
+
+    def busted(self) -> np.ndarray:
+        return self.totals() > 21
+
+    def blackjacks(self) -> np.ndarray:
+        return (self.num_cards == 2) & (self.hard == 11) & (self.aces == 1)
+
+    # --- Vectorised settlement ---
+
+    def pay_blackjacks(self) -> np.ndarray:
+        """Pays 3:2 on every first hand that is an unfinished Blackjack and stands it.
+        Returns the payout per seat (0 where nothing was paid)."""
+        paid = self.blackjacks()[:, 0] & ~self.stood[:, 0] & ~self.busted()[:, 0]
+        self.stood[paid, 0] = True
+        payouts = np.where(paid, (self.bets[:, 0] * 3) // 2, 0)
+        self.balances += payouts
+        return payouts
+
+    def first_hands_finished(self) -> bool:
+        return bool((self.stood[:, 0] | self.busted()[:, 0]).all())
+
+    def settle(self, dealer_total: int, dealer_bust: bool) -> np.ndarray:
+        """Settles every standing hand against the dealer and returns the net result per seat.
+        Busted hands were settled when they busted, and naturals by pay_blackjacks."""
+        live = self.active() & ~self.busted() & ~(self.blackjacks() & ~self.from_split)
+        totals = self.totals()
+        if dealer_bust:
+            outcome = live.astype(np.int64)
+        else:
+            outcome = np.where(live, np.sign(totals.astype(np.int64) - dealer_total), 0)
+        net = (outcome * self.bets).sum(axis=1)
+        self.balances += net
+        return net
+
+    def resolve_insurance(self, dealer_blackjack: bool) -> np.ndarray:
+        """Settles insurance (and, against a dealer Blackjack, every first hand); returns net per seat."""
+        if dealer_blackjack:
+            net = 2 * self.insurance_bets - np.where(self.blackjacks()[:, 0], 0, self.bets[:, 0])
+            self.stood[:, 0] = True
+        else:
+            net = -self.insurance_bets
+        self.balances += net
+        return net
+
+
+_CARD_HARD = np.array([card.hard for card in CARDS], dtype=np.uint8)
+
+
+class HandView:
+    """A ``Hand`` backed by one slot of a ``TableState``."""
+    __slots__ = ("table", "seat", "index")
+
+    def __init__(self, table: TableState, seat: int, index: int):
+        self.table = table
+        self.seat = seat
+        self.index = index
+
+    @property
+    def cards(self) -> List[Card]:
+        t, s, i = self.table, self.seat, self.index
+        return [CARDS[card_id] for card_id in t.cards[s, i, :t.num_cards[s, i]].tolist()]
+
+    @property
+    def hard(self) -> int:
+        return int(self.table.hard[self.seat, self.index])
+
+    @property
+    def aces(self) -> int:
+        return int(self.table.aces[self.seat, self.index])
+
+    @property
+    def value(self) -> HandValue:
+        t, s, i = self.table, self.seat, self.index
+        return HAND_VALUE_TABLE[t.hard[s, i]][t.aces[s, i]][int(t.num_cards[s, i] == 2)]
+
+    def append(self, card: Card):
+        self.table.add_card(self.seat, self.index, card.id)
+
+    @property
+    def bet(self) -> int:
+        return int(self.table.bets[self.seat, self.index])
+
+    @bet.setter
+    def bet(self, value: int):
+        self.table.bets[self.seat, self.index] = value
+
+    @property
+    def stood(self) -> bool:
+        return bool(self.table.stood[self.seat, self.index])
+
+    @stood.setter
+    def stood(self, value: bool):
+        self.table.stood[self.seat, self.index] = value
+
+    @property
+    def doubled(self) -> bool:
+        return bool(self.table.doubled[self.seat, self.index])
+
+    @doubled.setter
+    def doubled(self, value: bool):
+        self.table.doubled[self.seat, self.index] = value
+
+    @property
+    def from_split(self) -> bool:
+        return bool(self.table.from_split[self.seat, self.index])
+
+    @property
+    def total(self) -> int:
+        return self.value.total
+
+    @property
+    def soft(self) -> bool:
+        return self.value.soft
+
+    @property
+    def busted(self) -> bool:
+        return self.value.bust
+
+    @property
+    def blackjack(self) -> bool:
+        return self.value.blackjack
+
+    @property
+    def finished(self) -> bool:
+        return self.stood or self.value.bust
+
+    def __len__(self) -> int:
+        return int(self.table.num_cards[self.seat, self.index])
+
+    def __iter__(self) -> Iterator[Card]:
+        return iter(self.cards)
+
+    def __getitem__(self, index: int) -> Card:
+        return self.cards[index]
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __repr__(self) -> str:
+        return f"Hand([{', '.join(str(c) for c in self.cards)}], bet={self.bet}, {self.value.display})"
+
+
+class SeatHandsView(Sequence):
+    """One seat's hands, as the list ``BlackjackGame.player_hands[seat]``."""
+
+    def __init__(self, table: TableState, seat: int):
+        self.table = table
+        self.seat = seat
+        self._slots = [HandView(table, seat, index) for index in range(MAX_HANDS)]
+
+    def __len__(self) -> int:
+        return int(self.table.num_hands[self.seat])
+
+    def __getitem__(self, index: int) -> HandView:
+        count = int(self.table.num_hands[self.seat])
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("hand index out of range")
+        return self._slots[index]
+
+
+class SeatsView(Sequence):
+    """Every seat's hands, as ``BlackjackGame.player_hands``."""
+
+    def __init__(self, table: TableState):
+        self.table = table
+        self._seats = [SeatHandsView(table, seat) for seat in range(table.num_seats)]
+
+    def __len__(self) -> int:
+        return len(self._seats)
+
+    def __getitem__(self, seat: int) -> SeatHandsView:
+        return self._seats[seat]
+
@@ -0,0 +1,67 @@
+"""Settlement checks on rounds dealt from a stacked shoe."""
+import numpy as np
+import pytest
+
+from cards import VALUES
+from engine import BlackjackGame
+
+
+def stacked_game(order, num_players=1, compact=False, bet=10, balance=100):
+    """A game whose shoe deals `order` (card values) first: the dealer's two cards, then two per seat."""
+    game = BlackjackGame(num_players, np.random.default_rng(0), compact=compact)
+    for seat in range(num_players):
+        game.player_balances[seat] = balance
+        game.player_hands[seat][0].bet = bet
+    ids = [VALUES.index(value) for value in order]
+    game.deck.cards = np.array(ids + [VALUES.index("2")] * 40, dtype=np.uint8)
+    game.deck.position = 0
+    return game
+
+
+def finish_round(game):
+    if game.dealer_turn_active:
+        game.dealer_play()
+        game.evaluate_winner()
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_natural_is_paid_once_at_a_multi_seat_table(compact):
+    # Dealer 10+7; seat 1 has a natural, seat 2 stands on 20 so the dealer still plays
+    game = stacked_game(["10", "7", "A", "K", "10", "Q"], num_players=2, compact=compact)
+    game.deal_initial_cards()
+    assert game.player_balances[0] == 115
+    game.stand()
+    assert game.dealer_turn_active
+    finish_round(game)
+    assert game.game_over
+    assert list(game.player_balances) == [115, 110]
+    assert game.dealer_balance == 10000 - 15 - 10
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_dealer_does_not_play_against_only_naturals_and_busts(compact):
+    # Dealer 10+6; seat 1 has a natural, seat 2 hits 10+6 into a bust
+    game = stacked_game(["10", "6", "A", "K", "10", "6", "K"], num_players=2, compact=compact)
+    game.deal_initial_cards()
+    game.hit()
+    assert game.game_over and not game.dealer_turn_active
+    assert list(game.player_balances) == [115, 90]
+    assert len(game.dealer_hand) == 2
+
+
+@pytest.mark.parametrize("order, actions, net", [
+    (["10", "7", "5", "6", "10"], ["double_down"], 20), # Double and win
+    (["10", "7", "5", "6", "6"], ["double_down"], 0), # Double and push
+    (["10", "7", "10", "2", "10"], ["double_down"], -20), # Double and bust
+    (["10", "7", "8", "8", "10", "10"], ["split", "stand", "stand"], 20), # Both split hands win
+])
+def test_doubles_and_splits_settle_at_full_stake(order, actions, net):
+    game = stacked_game(order)
+    game.deal_initial_cards()
+    for action in actions:
+        if game.game_over or game.dealer_turn_active:
+            break
+        getattr(game, action)()
+    finish_round(game)
+    assert game.player_balances[0] - 100 == net
+    assert 10000 - game.dealer_balance == net
@@ -0,0 +1,35 @@
+"""Hand values from the precomputed table, and past its end."""
+import itertools
+
+from cards import Card
+from engine import BlackjackGame
+from hand import Hand
+from hand_values import HandValue, _evaluate, hand_state, hand_value
+
+RANKS = ('A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K')
+
+
+def cards(*values):
+    return [Card('Spades', value) for value in values]
+
+
+def test_table_matches_direct_evaluation():
+    for size in (2, 3, 4):
+        for values in itertools.combinations_with_replacement(RANKS, size):
+            hand = cards(*values)
+            hard, aces = hand_state(hand)
+            assert hand_value(hand) == _evaluate(hard, aces, size == 2)
+
+
+def test_totals_past_the_table_are_bust():
+    four_kings = cards('K', 'K', 'K', 'K')
+    assert hand_value(four_kings) == HandValue(40, False, True, False, (40,), "Bust (40)")
+    assert Hand(four_kings).value == hand_value(four_kings)
+    assert BlackjackGame().calculate_hand_value(four_kings) == ([40], False)
+
+
+def test_common_values():
+    assert hand_value(cards('A', 'K')).blackjack
+    assert hand_value(cards('A', '6')).display == "Soft 17"
+    assert hand_value(cards('A', 'A', '9')).total == 21
+    assert hand_value(cards('K', 'Q', '5')).display == "Bust (25)"
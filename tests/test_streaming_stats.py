@@ -0,0 +1,28 @@
+"""Risk-of-ruin sessions in BankrollTracker."""
+import numpy as np
+
+from streaming_stats import BankrollTracker
+
+
+def test_sessions_in_progress_are_not_counted():
+    tracker = BankrollTracker(bankroll=50, session_rounds=100)
+    bets = np.full(2000, 10)
+    for _ in range(20):
+        tracker.add_batch(np.full(2000, -10), bets) # Every seat is broke after five rounds
+    assert tracker.sessions == 0
+    for _ in range(80):
+        tracker.add_batch(np.zeros(2000, dtype=np.int64), bets)
+    assert (tracker.ruined, tracker.survived) == (2000, 0)
+
+
+def test_single_and_batch_updates_agree():
+    rng = np.random.default_rng(1)
+    nets = rng.choice([-20, -10, 0, 10, 15], size=(500, 8)) # Rounds x players
+    single, batch = BankrollTracker(50, 20), BankrollTracker(50, 20)
+    bets = np.full(8, 10)
+    for row in nets:
+        for player, net in enumerate(row):
+            single.add(player, int(net), 10)
+        batch.add_batch(row, bets)
+    assert 0 < batch.ruined < batch.sessions == 8 * 500 // 20
+    assert (single.ruined, single.survived, single.max_drawdown) == (batch.ruined, batch.survived, batch.max_drawdown)
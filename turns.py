@@ -0,0 +1,71 @@
+"""Turn order for the player hands of one round.
+
+``TurnQueue`` keeps the hands still waiting to play in table order (each
+seat's hands in order, split hands right after the hand they came from).
+The front of the queue is the hand whose turn it is. Hands that finish, by
+standing, busting, doubling or being dealt a Blackjack, are dropped lazily
+when they reach the front, and counted as they go. A dealt Blackjack is
+paid before the turns begin, so it gives the dealer nothing to play for. Finding the next turn and
+deciding whether the dealer has to play are both O(1) amortised, whatever
+the number of seats.
+"""
+from collections import deque
+from typing import Deque, List, Optional, Sequence, Tuple
+
+from hand import Hand
+
+Turn = Tuple[int, int] # (seat, hand index)
+
+
+class TurnQueue:
+    def __init__(self):
+        self._pending: Deque[Tuple[int, int, Hand]] = deque() # (seat, hand index, hand)
+        self._hands: Sequence[List[Hand]] = ()
+        self.live = 0 # Finished hands still in the round (stood or doubled): the dealer must play
+        self.busted = 0 # Finished hands that busted
+        self.naturals = 0 # Dealt Blackjacks, paid before the turns began
+
+    def start(self, player_hands: Sequence[List[Hand]]):
+        """Queues every seat's hands for a new round."""
+        self._hands = player_hands
+        self._pending = deque((seat, hand_idx, hand) for seat, hands in enumerate(player_hands)
+                              for hand_idx, hand in enumerate(hands))
+        self.live = 0
+        self.busted = 0
+        self.naturals = 0
+
+    def add_split(self, seat: int, hand_idx: int):
+        """Queues a hand created by splitting the current one, to be played straight after it.
+        The split replaces the current hand too, so the front entry is refreshed."""
+        hands = self._hands[seat]
+        if self._pending:
+            current_seat, current_idx, _ = self._pending[0]
+            self._pending[0] = (current_seat, current_idx, self._hands[current_seat][current_idx])
+            self._pending.insert(1, (seat, hand_idx, hands[hand_idx]))
+        else:
+            self._pending.append((seat, hand_idx, hands[hand_idx]))
+
+    def next(self) -> Optional[Turn]:
+        """The first hand still to play, dropping (and counting) any finished hands ahead of it."""
+        pending = self._pending
+        while pending:
+            seat, hand_idx, hand = pending[0]
+            bust = hand.value.bust
+            if not (hand.stood or bust): # Hand.finished, inlined
+                return seat, hand_idx
+            pending.popleft()
+            if bust:
+                self.busted += 1
+            elif hand.blackjack and not hand.from_split:
+                self.naturals += 1
+            else:
+                self.live += 1
+        return None
+
+    @property
+    def dealer_needed(self) -> bool:
+        """Once the queue is empty: whether any hand is left for the dealer to beat."""
+        return self.live > 0
+
+    def __len__(self) -> int:
+        return len(self._pending)